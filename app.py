@@ -1,6 +1,6 @@
 import streamlit as st
 
-from pawpal_system import Owner, Pet, Task, Scheduler, Plan
+from pawpal_system import IncrementalPlanner, Owner, Pet, Task, Scheduler, Plan
 
 st.set_page_config(page_title="PawPal+", page_icon="🐾", layout="centered")
 
@@ -52,6 +52,7 @@ if "pet" not in st.session_state or st.session_state.pet.name != pet_name:
     owner.add_pet(pet)
     st.session_state.owner = owner
     st.session_state.pet = pet
+    st.session_state.planner = None
 
 pet: Pet = st.session_state.pet
 
@@ -67,21 +68,38 @@ with col3:
     priority = st.selectbox("Priority", ["low", "medium", "high"], index=2)
 
 if st.button("Add task"):
-    pet.add_task(Task(title=task_title, duration_minutes=int(duration), priority=priority))
+    new_task = Task(title=task_title, duration_minutes=int(duration), priority=priority)
+    pet.add_task(new_task)
+    # Keep the live plan in step with the task list instead of rebuilding it.
+    if st.session_state.planner is not None:
+        st.session_state.planner.add(new_task)
 
 if pet.list_tasks():
     st.write("Current tasks (sorted by priority):")
     # Preview the order the scheduler will consider tasks in: high priority
-    # first, shorter tasks breaking ties. Uses the same Scheduler logic as
-    # the real plan so the display matches what gets scheduled. Sorting is
-    # independent of the time budget, so the value here is just a placeholder.
-    preview = Scheduler(available_minutes=1440).sort_by_priority(pet.list_tasks())
+    # first, shorter tasks breaking ties. The pet keeps its tasks in that
+    # order as they change, so the preview is read off without sorting.
+    preview = pet.tasks_by_priority()
     st.table(
         [
             {"title": t.title, "duration_minutes": t.duration_minutes, "priority": t.priority}
             for t in preview
         ]
     )
+
+    pending = [t for t in pet.list_tasks() if not t.is_complete()]
+    if pending:
+        # Address the task by its stable id rather than its list position, so
+        # edits between reruns can't make the choice point at another task.
+        done_id = st.selectbox(
+            "Mark a task complete",
+            [t.id for t in pending],
+            format_func=lambda task_id: pet.get_task(task_id).title,
+        )
+        if st.button("Complete task"):
+            follow_up = pet.complete_task_by_id(done_id)
+            if follow_up is not None and st.session_state.planner is not None:
+                st.session_state.planner.add(follow_up)
 else:
     st.info("No tasks yet. Add one above.")
 
@@ -96,34 +114,72 @@ if st.button("Generate schedule"):
     if not pet.list_tasks():
         st.warning("Add at least one task before generating a schedule.")
     else:
-        scheduler = Scheduler(available_minutes=int(available_minutes))
-        plan: Plan = scheduler.build_plan(pet.list_tasks(), pet_name=pet.name)
-
-        # Order the slots chronologically before display/conflict checks so the
-        # table reads top-to-bottom by start time.
-        plan.entries = scheduler.sort_by_time(plan.entries)
-
-        st.markdown(f"### Today's Schedule for {pet.name}")
-        if plan.entries:
-            st.success(
-                f"Scheduled {len(plan.entries)} task(s) using "
-                f"{plan.total_minutes} of {int(available_minutes)} available minutes."
-            )
-            st.table(plan.to_table())
-        else:
-            st.warning("No tasks could be scheduled within the available time.")
-
-        # Surface any overlapping time slots using the Scheduler's own
-        # conflict detection.
-        conflicts = scheduler.detect_conflicts(plan.entries)
-        for warning in conflicts:
-            st.warning(warning)
-
-        st.markdown("**Why this plan?**")
-        st.text(plan.explain())
-
-        if plan.skipped:
-            st.warning(
-                "Skipped (not enough time): "
-                + ", ".join(t.title for t in plan.skipped)
+        # Reuse the live plan while the budget is unchanged; task edits have
+        # already been applied to it incrementally. Only a new budget (or a
+        # new pet) needs a full build.
+        planner = st.session_state.planner
+        if planner is None or planner.scheduler.available_minutes != int(available_minutes):
+            planner = IncrementalPlanner(
+                Scheduler(available_minutes=int(available_minutes)),
+                pet.list_tasks(),
+                pet_name=pet.name,
             )
+            st.session_state.planner = planner
+
+# Once generated, the schedule stays on screen and follows task edits.
+planner = st.session_state.planner
+if planner is not None:
+    scheduler = planner.scheduler
+    # Greedy slots are laid back-to-back, so plan.entries is already in
+    # start-time order for display and conflict checks.
+    plan: Plan = planner.plan
+
+    # Re-format only the slots that changed since the last render: rows and
+    # explain lines for untouched slots, and the conflict warnings when no
+    # slot changed, come from the previous rerun.
+    shown = st.session_state.get("shown")
+    if shown is None or shown["planner"] is not planner:
+        shown = st.session_state.shown = {
+            "planner": planner,
+            "plan": Plan(),
+            "rows": {},
+            "lines": {},
+            "conflicts": [],
+        }
+    changes = plan.diff(shown["plan"])
+    if changes:
+        for entry in changes.removed:
+            shown["rows"].pop(entry.task_id, None)
+            shown["lines"].pop(entry.task_id, None)
+        for entry in changes.added + changes.retimed:
+            shown["rows"][entry.task_id] = plan.row(entry)
+            shown["lines"][entry.task_id] = plan.explain_line(entry)
+        if changes.added or changes.removed or changes.retimed:
+            shown["conflicts"] = scheduler.detect_conflicts(plan.entries)
+        # The planner updates its plan in place, so keep a copy of the slots to diff against.
+        shown["plan"] = Plan(entries=list(plan.entries), skipped=list(plan.skipped))
+    rows, lines = shown["rows"], shown["lines"]
+
+    st.markdown(f"### Today's Schedule for {pet.name}")
+    if plan.entries:
+        st.success(
+            f"Scheduled {len(plan.entries)} task(s) using "
+            f"{plan.total_minutes} of {scheduler.available_minutes} available minutes."
+        )
+        st.table([rows[entry.task_id] for entry in plan.entries])
+    else:
+        st.warning("No tasks could be scheduled within the available time.")
+
+    # Surface any overlapping time slots using the Scheduler's own
+    # conflict detection.
+    for warning in shown["conflicts"]:
+        st.warning(warning)
+
+    st.markdown("**Why this plan?**")
+    st.text(plan.explain(lines[entry.task_id] for entry in plan.entries))
+
+    if plan.skipped:
+        st.warning(
+            "Skipped (not enough time): "
+            + ", ".join(t.title for t in plan.skipped)
+        )
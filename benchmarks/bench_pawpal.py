@@ -0,0 +1,265 @@
+"""Benchmarks for the PawPal+ scheduling, conflict and query paths.
+
+Builds a synthetic population (N owners x M pets x K tasks with mixed
+priorities, recurrences and overlapping per-owner timelines), times each hot
+path, and records throughput plus peak memory per scale. Results can be saved
+as a JSON baseline and compared against one later; the run fails (exit code 1)
+when any benchmark's throughput drops by more than the threshold.
+
+Run with:
+    python benchmarks/bench_pawpal.py                       # print results
+    python benchmarks/bench_pawpal.py --save baseline.json  # record a baseline
+    python benchmarks/bench_pawpal.py --compare baseline.json --threshold 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time as clock
+import tracemalloc
+from datetime import date, time, timedelta
+
+# Allow importing pawpal_system.py from the project root.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pawpal_system import Owner, Pet, ScheduledTask, Scheduler, Task
+
+# name -> (owners, pets per owner, tasks per pet)
+SCALES = {
+    "small": (10, 2, 10),
+    "medium": (100, 3, 20),
+    "large": (500, 4, 40),
+}
+
+PRIORITIES = ("low", "medium", "high")
+CATEGORIES = ("walk", "feeding", "meds", "grooming", "enrichment", "cleaning")
+RECURRENCES = ("none", "none", "daily", "weekly")
+
+
+def make_owners(
+    n_owners: int, pets_per_owner: int, tasks_per_pet: int, *, seed: int = 0
+) -> list[Owner]:
+    """Build a reproducible synthetic population of owners, pets and tasks."""
+    rng = random.Random(seed)
+    first_day = date(2026, 1, 1)
+    owners = []
+    for o in range(n_owners):
+        owner = Owner(name=f"Owner {o}")
+        owner.add_preference("day_start", time(rng.randint(6, 9), rng.choice((0, 15, 30, 45))))
+        owner.add_preference("available_minutes", rng.randint(60, 480))
+        for p in range(pets_per_owner):
+            pet = Pet(name=f"Pet {o}-{p}", species=rng.choice(("dog", "cat", "other")))
+            for k in range(tasks_per_pet):
+                pet.add_task(
+                    Task(
+                        title=f"Task {k}",
+                        duration_minutes=rng.randint(5, 60),
+                        priority=rng.choice(PRIORITIES),
+                        category=rng.choice(CATEGORIES),
+                        recurrence=rng.choice(RECURRENCES),
+                        status="complete" if rng.random() < 0.3 else "pending",
+                        due_date=first_day + timedelta(days=rng.randint(0, 30)),
+                    )
+                )
+            owner.add_pet(pet)
+        owners.append(owner)
+    return owners
+
+
+def _scheduler_for(owner: Owner) -> Scheduler:
+    """A scheduler using the owner's own budget and day start."""
+    return Scheduler(
+        available_minutes=owner.get_preference("available_minutes"),
+        start_time=owner.get_preference("day_start"),
+    )
+
+
+def _pooled_timelines(owners: list[Owner]) -> list[list[ScheduledTask]]:
+    """Plan every pet from its owner's day start and pool each owner's slots (they overlap)."""
+    timelines = []
+    for owner in owners:
+        scheduler = _scheduler_for(owner)
+        entries: list[ScheduledTask] = []
+        for pet in owner.pets:
+            entries.extend(scheduler.build_plan(pet.list_tasks(), pet_name=pet.name).entries)
+        timelines.append(entries)
+    return timelines
+
+
+def _bench_build_plan(owners):
+    """Plan every pet with its owner's budget; items = tasks considered."""
+    count = 0
+    for owner in owners:
+        scheduler = _scheduler_for(owner)
+        for pet in owner.pets:
+            scheduler.build_plan(pet.list_tasks(), pet_name=pet.name)
+            count += len(pet.tasks)
+    return count
+
+
+def _bench_sort_by_priority(owners):
+    """Priority-sort every pet's task list; items = tasks sorted."""
+    scheduler = Scheduler(available_minutes=1440)
+    count = 0
+    for owner in owners:
+        for pet in owner.pets:
+            scheduler.sort_by_priority(pet.list_tasks())
+            count += len(pet.tasks)
+    return count
+
+
+def _bench_sort_by_time(owners, timelines):
+    """Sort the whole kennel's pooled slots by start time; items = slots."""
+    scheduler = Scheduler(available_minutes=1440)
+    kennel = [entry for timeline in timelines for entry in timeline]
+    scheduler.sort_by_time(kennel)
+    return len(kennel)
+
+
+def _bench_detect_conflicts(owners, timelines):
+    """Find overlaps in each owner's pooled timeline; items = slots scanned."""
+    scheduler = Scheduler(available_minutes=1440)
+    count = 0
+    for timeline in timelines:
+        scheduler.detect_conflicts(timeline)
+        count += len(timeline)
+    return count
+
+
+def _bench_resolve_conflicts(owners, timelines):
+    """Sort and resolve each owner's pooled timeline; items = slots."""
+    scheduler = Scheduler(available_minutes=1440)
+    count = 0
+    for timeline in timelines:
+        # resolve_conflicts mutates, so work on fresh copies of the slots.
+        ordered = scheduler.sort_by_time(
+            [ScheduledTask(e.task, pet_name=e.pet_name, start_minute=e.start_minute, end_minute=e.end_minute)
+             for e in timeline]
+        )
+        scheduler.resolve_conflicts(ordered)
+        count += len(ordered)
+    return count
+
+
+def _bench_find_tasks(owners):
+    """Run the dashboard's pending/completed/per-pet filters; items = tasks returned."""
+    count = 0
+    for owner in owners:
+        count += len(owner.find_tasks(completed=False))
+        count += len(owner.find_tasks(completed=True))
+        count += len(owner.find_tasks(pet_name=owner.pets[0].name))
+    return count
+
+
+# name -> (function, needs pooled timelines)
+BENCHMARKS = {
+    "build_plan": (_bench_build_plan, False),
+    "sort_by_priority": (_bench_sort_by_priority, False),
+    "sort_by_time": (_bench_sort_by_time, True),
+    "detect_conflicts": (_bench_detect_conflicts, True),
+    "resolve_conflicts": (_bench_resolve_conflicts, True),
+    "find_tasks": (_bench_find_tasks, False),
+}
+
+
+def run_scale(name: str, *, repeat: int = 3, seed: int = 0) -> dict:
+    """Time every benchmark at one scale; return {benchmark: metrics}."""
+    owners = make_owners(*SCALES[name], seed=seed)
+    timelines = _pooled_timelines(owners)
+    results = {}
+    for bench, (func, pooled) in BENCHMARKS.items():
+        args = (owners, timelines) if pooled else (owners,)
+        best = float("inf")
+        for _ in range(repeat):
+            start = clock.perf_counter()
+            items = func(*args)
+            best = min(best, clock.perf_counter() - start)
+        # Measure memory in a separate run; tracemalloc slows the code down.
+        tracemalloc.start()
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[bench] = {
+            "seconds": round(best, 6),
+            "items": items,
+            "items_per_sec": round(items / best, 1) if best > 0 else float("inf"),
+            "peak_kib": round(peak / 1024, 1),
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return a message for each benchmark whose throughput fell more than `threshold`.
+
+    `threshold` is a fraction: 0.25 flags anything over 25% slower than the
+    baseline. Benchmarks or scales missing from the baseline are ignored.
+    """
+    regressions = []
+    for scale, benches in results["scales"].items():
+        for bench, metrics in benches.items():
+            old = baseline.get("scales", {}).get(scale, {}).get(bench)
+            if not old:
+                continue
+            drop = 1 - metrics["items_per_sec"] / old["items_per_sec"]
+            if drop > threshold:
+                regressions.append(
+                    f"{scale}/{bench}: {metrics['items_per_sec']:.0f} items/s vs "
+                    f"baseline {old['items_per_sec']:.0f} ({drop:.0%} slower)"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the selected scales, print a table, and save/compare baselines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="JSON baseline to check against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25,
+        help="allowed throughput drop vs the baseline, as a fraction (default 0.25)",
+    )
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "scales": {name: run_scale(name, repeat=args.repeat, seed=args.seed) for name in args.scales},
+    }
+    for scale, benches in results["scales"].items():
+        owners, pets, tasks = SCALES[scale]
+        print(f"\n{scale} ({owners} owners x {pets} pets x {tasks} tasks)")
+        print("-" * 64)
+        for bench, m in benches.items():
+            print(
+                f"  {bench:<18} {m['seconds'] * 1000:>9.2f} ms  "
+                f"{m['items_per_sec']:>12,.0f} items/s  {m['peak_kib']:>9,.1f} KiB peak"
+            )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Load generator for the PawPal+ planning service (pawpal_service.py).
+
+Opens many concurrent keep-alive connections, each sending a series of plan
+and task requests for random owners of a synthetic population (the same one
+bench_pawpal.py builds), and reports throughput, latency percentiles and
+how many requests were coalesced or turned away.
+
+Run with:
+    python benchmarks/load_service.py --connections 2000 --requests 5
+    python benchmarks/load_service.py --port 8080   # against a running service
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time as clock
+from urllib.parse import quote
+
+# Allow importing pawpal_service.py from the project root.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bench_pawpal import SCALES, make_owners
+from pawpal_metrics import MemorySink, Recorder
+from pawpal_service import PlanningService
+
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, target: str) -> int:
+    """Send one keep-alive GET and read the whole response; return the status code."""
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    length = next(int(line.split(":", 1)[1]) for line in lines if line.lower().startswith("content-length:"))
+    await reader.readexactly(length)
+    return int(lines[0].split()[1])
+
+
+async def _client(host, port, targets, latencies, statuses, start_gate) -> None:
+    """One connection: wait for the go signal, then send `targets` in turn."""
+    await start_gate.wait()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for target in targets:
+            sent = clock.perf_counter()
+            status = await _request(reader, writer, target)
+            latencies.append(clock.perf_counter() - sent)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    """The value below which `fraction` of the sorted samples fall."""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(args) -> dict:
+    """Drive the load and return the summary."""
+    rng = random.Random(args.seed)
+    owners = make_owners(*SCALES[args.scale], seed=args.seed)
+    hot = owners[: max(1, int(len(owners) * args.hot_fraction))]  # most traffic goes to a few owners
+
+    sink = None
+    server = None
+    host, port = args.host, args.port
+    if port is None:
+        sink = MemorySink()
+        service = PlanningService(owners, max_workers=args.workers, max_pending=args.max_pending, recorder=Recorder(sink))
+        server = await service.start(host, 0)
+        port = server.sockets[0].getsockname()[1]
+
+    def target() -> str:
+        owner = rng.choice(hot if rng.random() < 0.8 else owners)
+        name = quote(owner.name)
+        return f"/owners/{name}/tasks?completed=false" if rng.random() < 0.2 else f"/owners/{name}/plan"
+
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    gate = asyncio.Event()
+    clients = [
+        asyncio.create_task(_client(host, port, [target() for _ in range(args.requests)], latencies, statuses, gate))
+        for _ in range(args.connections)
+    ]
+    await asyncio.sleep(0)
+    started = clock.perf_counter()
+    gate.set()
+    results = await asyncio.gather(*clients, return_exceptions=True)
+    elapsed = clock.perf_counter() - started
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    ordered = sorted(latencies)
+    return {
+        "connections": args.connections,
+        "requests": len(latencies),
+        "failed_connections": sum(isinstance(r, Exception) for r in results),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed > 0 else float("inf"),
+        "latency_ms": {
+            name: round(_percentile(ordered, q) * 1000, 2) if ordered else None
+            for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+        },
+        "statuses": statuses,
+        "counters": sink.counters if sink is not None else {},
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the load test and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=5, help="requests per connection")
+    parser.add_argument("--scale", choices=SCALES, default="medium")
+    parser.add_argument("--hot-fraction", type=float, default=0.05, help="share of owners that get 80%% of requests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="target a running service (default: start one in-process)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-pending", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(run(args))
+    print(f"{summary['requests']} requests over {summary['connections']} connections in {summary['seconds']} s")
+    print(f"  throughput   {summary['requests_per_sec']:,.0f} req/s")
+    print("  latency      " + "  ".join(f"{k} {v} ms" for k, v in summary["latency_ms"].items()))
+    print(f"  statuses     {summary['statuses']}")
+    if summary["failed_connections"]:
+        print(f"  failed       {summary['failed_connections']} connection(s)")
+    for name, value in sorted(summary["counters"].items()):
+        print(f"  {name:<28} {value}")
+    return 1 if summary["failed_connections"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -84,6 +84,18 @@ def main() -> None:
     else:
         print("No scheduling conflicts found.")
 
+    # 5c. Plan both pets onto ONE shared timeline instead: a single budget,
+    #     and the owner is never double-booked.
+    print("\n" + "=" * 52)
+    print("Shared timeline for all pets (Scheduler.build_shared_plan)")
+    print("=" * 52)
+    shared = scheduler.build_shared_plan(owner)
+    for e in shared.entries:
+        print(f"  {e.start_time:%H:%M}-{e.end_time:%H:%M}  {e.pet_name}: {e.task.title}")
+    if shared.skipped:
+        print(f"  Skipped (not enough time): {', '.join(t.title for t in shared.skipped)}")
+    print(f"Conflicts: {len(scheduler.detect_conflicts(shared.entries))}")
+
     # 6. Demonstrate find_tasks filtering by status and by pet name.
     print("\n" + "=" * 52)
     print("Filtering with Owner.find_tasks")
@@ -0,0 +1,87 @@
+"""Headless PawPal+ planner for scripts and cron jobs.
+
+Reads owners/pets/tasks from CSV or JSON Lines files (see pawpal_io for the
+fields), or from stdin when no file (or "-") is given, plans every pet in
+parallel, and writes one JSON object per pet to stdout.
+
+Run with:
+    python -m pawpal tasks.csv --available-minutes 90 --start 07:30
+    cat tasks.jsonl | python -m pawpal --format jsonl --output table
+
+Only the standard library and pawpal_system/pawpal_io are imported (never
+Streamlit), and those only once the arguments have parsed, so `--help` and
+bad arguments return immediately.
+"""
+
+from __future__ import annotations
+
+import sys
+
+
+def _parse_args(argv: list[str] | None):
+    """Parse the command line."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m pawpal", description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help='CSV/JSONL task files ("-" or none reads stdin)')
+    parser.add_argument(
+        "--format", choices=("csv", "jsonl"),
+        help="input format (default: from each file's extension; csv for stdin)",
+    )
+    parser.add_argument("--available-minutes", type=int, default=120, help="daily budget per pet (default 120)")
+    parser.add_argument("--start", default="08:00", help="time planning starts, HH:MM (default 08:00)")
+    parser.add_argument("--strategy", choices=("greedy", "optimal"), default="greedy")
+    parser.add_argument("--output", choices=("explain", "table", "both"), default="both")
+    parser.add_argument("--workers", type=int, help="worker pool size (default: Python's choice)")
+    parser.add_argument("--processes", action="store_true", help="plan in a process pool instead of threads")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Load the tasks, plan every pet and print one JSON line per pet."""
+    args = _parse_args(argv)
+
+    import json
+    from datetime import time
+
+    from pawpal_io import format_for, load_owners
+    from pawpal_system import Scheduler
+
+    try:
+        start = time.fromisoformat(args.start)
+    except ValueError:
+        print(f"pawpal: --start must be HH:MM, got {args.start!r}", file=sys.stderr)
+        return 2
+
+    owners = []
+    try:
+        for path in args.files or ["-"]:
+            if path == "-":
+                owners = load_owners(sys.stdin, args.format or "csv", owners)
+            else:
+                with open(path, newline="") as f:
+                    owners = load_owners(f, args.format or format_for(path), owners)
+    except (OSError, ValueError) as exc:
+        print(f"pawpal: {exc}", file=sys.stderr)
+        return 1
+
+    scheduler = Scheduler(available_minutes=args.available_minutes, start_time=start, strategy=args.strategy)
+    pets = [(owner, pet) for owner in owners for pet in owner.pets]
+    plans = scheduler.build_plans(
+        [pet for _, pet in pets], max_workers=args.workers, use_processes=args.processes
+    )
+
+    out = sys.stdout
+    for (owner, pet), plan in zip(pets, plans):
+        record = {"owner": owner.name, "pet": pet.name, "total_minutes": plan.total_minutes}
+        if args.output != "table":
+            record["explain"] = plan.explain()
+        if args.output != "explain":
+            record["table"] = plan.to_table()
+        record["skipped"] = [t.title for t in plan.skipped]
+        out.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""Streaming import of care schedules and export of plans for PawPal+.
+
+Clinics send task dumps as CSV (with a header row) or JSON Lines (one object
+per line). Both use the same fields:
+
+    owner, pet, species, title, duration_minutes, priority, category,
+    recurrence, status, due_date, earliest, latest
+
+Only owner, pet, title and duration_minutes are required; the rest fall back
+to the Task defaults (species falls back to "other"). Rows are read, checked
+and converted one at a time, so only the resulting Tasks are kept in memory,
+never the file. Pass `compact=True` to load_owners to keep each pet's tasks
+in a TaskStore as well.
+
+Exporting works the same way in reverse: write_plan_csv / write_plan_jsonl
+pull one row at a time from Plan.iter_rows, and write_plan_text one line at
+a time from Plan.iter_explain, and write it straight out.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from datetime import date, time
+from typing import IO, Iterable, Iterator
+
+from pawpal_system import PRIORITY_RANKS, RECURRENCE_DELTAS, Owner, Pet, Plan, Task, TaskStore
+
+FIELDS = (
+    "owner", "pet", "species", "title", "duration_minutes",
+    "priority", "category", "recurrence", "status", "due_date", "earliest", "latest",
+)
+REQUIRED_FIELDS = ("owner", "pet", "title", "duration_minutes")
+FORMATS = ("csv", "jsonl")
+
+# Columns written by the plan exporters: the pet, then Plan.to_table's columns.
+PLAN_FIELDS = ("pet", "start", "end", "task", "duration_minutes", "priority")
+
+_RECURRENCES = {"none", *RECURRENCE_DELTAS}
+_STATUSES = {"pending", "complete"}
+
+
+def format_for(path: str) -> str:
+    """Guess the file format from its extension: "jsonl" for .jsonl/.ndjson, else "csv"."""
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_records(stream: IO[str], fmt: str = "csv") -> Iterator[tuple[int, dict]]:
+    """Yield (line_number, record) for each row of a CSV or JSON Lines stream.
+
+    Blank JSON lines are skipped. Raises ValueError for malformed JSON or a
+    JSON line that isn't an object.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"line {line_number}: invalid JSON ({exc.msg})") from None
+            if not isinstance(record, dict):
+                raise ValueError(f"line {line_number}: expected a JSON object")
+            yield line_number, record
+    else:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+
+
+def iter_tasks(stream: IO[str], fmt: str = "csv") -> Iterator[tuple[str, str, str, Task]]:
+    """Yield (owner_name, pet_name, species, task) for each valid row.
+
+    Raises ValueError naming the line number at the first invalid row.
+    """
+    # Dumps repeat the same few dates/times a lot; keyed by (type, text) so
+    # "07:00" parsed as a time is never handed back as a date.
+    parsed: dict[tuple[type, str], date | time] = {}
+    for line_number, record in read_records(stream, fmt):
+        try:
+            yield _parse_record(record, parsed)
+        except ValueError as exc:
+            raise ValueError(f"line {line_number}: {exc}") from None
+
+
+def _parse_record(record: dict, parsed: dict[tuple[type, str], date | time]) -> tuple[str, str, str, Task]:
+    """Check one record and convert it to (owner_name, pet_name, species, task)."""
+    for name in REQUIRED_FIELDS:
+        if record.get(name) in (None, ""):
+            raise ValueError(f"missing required field {name!r}")
+
+    try:
+        duration = int(record["duration_minutes"])
+    except (TypeError, ValueError):
+        raise ValueError(f"duration_minutes must be a whole number, got {record['duration_minutes']!r}") from None
+    if duration <= 0:
+        raise ValueError(f"duration_minutes must be positive, got {duration}")
+
+    # JSON values can be lists/objects: check the type before the (hashing) membership tests.
+    priority = record.get("priority") or "medium"
+    if not isinstance(priority, str) or priority not in PRIORITY_RANKS:
+        raise ValueError(f"unknown priority {priority!r}")
+    recurrence = record.get("recurrence") or "none"
+    if not isinstance(recurrence, str) or recurrence not in _RECURRENCES:
+        raise ValueError(f"unknown recurrence {recurrence!r}")
+    status = record.get("status") or "pending"
+    if not isinstance(status, str) or status not in _STATUSES:
+        raise ValueError(f"unknown status {status!r}")
+    category = record.get("category") or "general"
+    if not isinstance(category, str):
+        raise ValueError(f"category must be text, got {category!r}")
+
+    due = _parse_cached(record, "due_date", date, "YYYY-MM-DD", parsed)
+    earliest = _parse_cached(record, "earliest", time, "HH:MM", parsed)
+    latest = _parse_cached(record, "latest", time, "HH:MM", parsed)
+
+    task = Task(
+        title=str(record["title"]),
+        duration_minutes=duration,
+        priority=priority,
+        category=category,
+        recurrence=recurrence,
+        status=status,
+        due_date=due,
+        earliest=earliest,
+        latest=latest,
+    )
+    return str(record["owner"]), str(record["pet"]), record.get("species") or "other", task
+
+
+def _parse_cached(record: dict, name: str, kind: type, shape: str, parsed: dict):
+    """Parse an optional ISO date/time field, reusing earlier results for the same text."""
+    text = record.get(name) or None
+    if text is None:
+        return None
+    if not isinstance(text, str):
+        raise ValueError(f"{name} must be {shape}, got {text!r}")
+    value = parsed.get((kind, text))
+    if value is None:
+        try:
+            value = parsed[kind, text] = kind.fromisoformat(text)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be {shape}, got {text!r}") from None
+    return value
+
+
+def load_owners(
+    stream: IO[str],
+    fmt: str = "csv",
+    owners: Iterable[Owner] = (),
+    *,
+    compact: bool = False,
+) -> list[Owner]:
+    """Read tasks from `stream` and attach each to its owner's pet.
+
+    Owners and pets are matched by exact name; `owners` seeds the lookup so
+    a dump can add to existing owners. Missing owners and pets are created in
+    the order they first appear. With `compact=True`, new pets keep their
+    tasks in a TaskStore. Returns every owner (seeded ones first).
+    """
+    by_name = {owner.name: owner for owner in owners}
+    pets = {(owner.name, pet.name): pet for owner in by_name.values() for pet in owner.pets}
+    for owner_name, pet_name, species, task in iter_tasks(stream, fmt):
+        pet = pets.get((owner_name, pet_name))
+        if pet is None:
+            owner = by_name.get(owner_name)
+            if owner is None:
+                owner = by_name[owner_name] = Owner(name=owner_name)
+            pet = Pet(name=pet_name, species=species, tasks=TaskStore() if compact else [])
+            owner.add_pet(pet)
+            pets[owner_name, pet_name] = pet
+        pet.add_task(task)
+    return list(by_name.values())
+
+
+def iter_plan_rows(plans: Iterable[Plan]) -> Iterator[dict]:
+    """Yield every plan's to_table rows, each tagged with the entry's pet."""
+    for plan in plans:
+        for entry, row in zip(plan.entries, plan.iter_rows()):
+            yield {"pet": entry.pet_name, **row}
+
+
+def write_plan_csv(plans: Iterable[Plan], stream: IO[str]) -> int:
+    """Write the plans' rows to `stream` as CSV with a header; return the row count."""
+    writer = csv.DictWriter(stream, fieldnames=PLAN_FIELDS)
+    writer.writeheader()
+    count = 0
+    for row in iter_plan_rows(plans):
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_plan_jsonl(plans: Iterable[Plan], stream: IO[str]) -> int:
+    """Write the plans' rows to `stream` as JSON Lines; return the row count."""
+    count = 0
+    for row in iter_plan_rows(plans):
+        stream.write(json.dumps(row) + "\n")
+        count += 1
+    return count
+
+
+def write_plan_text(plans: Iterable[Plan], stream: IO[str]) -> int:
+    """Write each plan's explanation to `stream`, a blank line between plans; return the line count."""
+    count = 0
+    for i, plan in enumerate(plans):
+        if i:
+            stream.write("\n")
+        for line in plan.iter_explain():
+            stream.write(line + "\n")
+            count += 1
+    return count
@@ -0,0 +1,106 @@
+"""Lightweight instrumentation for the PawPal+ scheduler.
+
+A Recorder collects timing spans ("how long did build_plan take?") and
+counters ("how many tasks were skipped?") and forwards each one to its sinks:
+
+- MemorySink keeps running totals in memory and can dump them as
+  Prometheus-style text (`to_prometheus`).
+- JsonLinesSink appends one JSON object per event to a file.
+
+Pass a Recorder to `Scheduler(..., recorder=...)` to turn instrumentation on.
+With no recorder (the default) the scheduler skips all of this.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+
+class MemorySink:
+    """Aggregates spans (count/total/max seconds) and counter totals in memory."""
+
+    def __init__(self) -> None:
+        """Start with no recorded spans or counters."""
+        self.spans: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, int] = {}
+        self._lock = threading.Lock()  # build_plans may record from worker threads
+
+    def add_span(self, name: str, seconds: float) -> None:
+        """Fold one timed span into the totals for `name`."""
+        with self._lock:
+            stats = self.spans.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            stats["count"] += 1
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def add_count(self, name: str, value: int) -> None:
+        """Add `value` to the counter `name`."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_prometheus(self, prefix: str = "pawpal") -> str:
+        """Render the totals in the Prometheus text exposition format."""
+        lines = [
+            f"# TYPE {prefix}_span_seconds summary",
+        ]
+        for name, stats in sorted(self.spans.items()):
+            lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {stats["count"]}')
+            lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {stats["total_seconds"]:.9f}')
+        lines.append(f"# TYPE {prefix}_span_seconds_max gauge")
+        for name, stats in sorted(self.spans.items()):
+            lines.append(f'{prefix}_span_seconds_max{{span="{name}"}} {stats["max_seconds"]:.9f}')
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+class JsonLinesSink:
+    """Writes each span/counter event as one JSON object per line."""
+
+    def __init__(self, stream: IO[str]) -> None:
+        """Write events to an open text stream (a file, sys.stderr, ...)."""
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, seconds: float) -> None:
+        """Emit a span event."""
+        self._write({"type": "span", "name": name, "seconds": seconds, "ts": time.time()})
+
+    def add_count(self, name: str, value: int) -> None:
+        """Emit a counter event."""
+        self._write({"type": "count", "name": name, "value": value, "ts": time.time()})
+
+    def _write(self, event: dict) -> None:
+        """Serialize and append one event."""
+        line = json.dumps(event)
+        with self._lock:
+            self.stream.write(line + "\n")
+
+
+class Recorder:
+    """Times spans and counts events, forwarding each to every sink."""
+
+    def __init__(self, *sinks) -> None:
+        """Record to the given sinks (a fresh MemorySink if none are given)."""
+        self.sinks = list(sinks) or [MemorySink()]
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the body of a `with` block as a span called `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            for sink in self.sinks:
+                sink.add_span(name, seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add `value` to the counter `name`."""
+        for sink in self.sinks:
+            sink.add_count(name, value)
@@ -0,0 +1,335 @@
+"""Local HTTP/JSON planning service for PawPal+ clients.
+
+Serves plans and task queries for owners loaded at startup (from CSV/JSON
+Lines task files, see pawpal_io) over a small asyncio HTTP/1.1 server with
+keep-alive:
+
+    GET /health
+    GET /owners/<owner>/plan?available_minutes=90&start=07:30&strategy=optimal
+    GET /owners/<owner>/tasks?completed=false&pet=Mochi&category=walk&due_date=2026-03-01
+
+Plans default to the owner's "available_minutes"/"day_start"/"blocked"
+preferences (see Scheduler.for_owner); query parameters override them, with
+available_minutes capped at a day (1440).
+
+Requests for the same owner and parameters that arrive while that plan is
+being computed share one computation instead of each planning again. The
+planning itself runs in an executor so the event loop keeps serving other
+connections, at most `max_workers` plans run at once, and when
+`max_pending` distinct plans are already in flight (or `max_connections`
+clients are connected) new work is turned away with 503 and Retry-After,
+so a burst can't queue up unbounded work.
+
+Run with:
+    python -m pawpal_service tasks.csv --port 8080
+
+and load-test with benchmarks/load_service.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import Executor
+from datetime import date, time
+from typing import Iterable
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from pawpal_system import PLAN_STRATEGIES, Owner, Pet, Scheduler, Task
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+# A plan covers one day, so larger available_minutes are capped to this.
+MAX_AVAILABLE_MINUTES = 24 * 60
+
+
+class ServiceError(Exception):
+    """An error answered with an HTTP status and a JSON {"error": message} body."""
+
+    def __init__(self, status: int, message: str) -> None:
+        """Record the status code and message for the response."""
+        super().__init__(message)
+        self.status = status
+
+
+class PlanningService:
+    """Answers plan and task queries for a fixed set of owners over HTTP."""
+
+    def __init__(
+        self,
+        owners: Iterable[Owner],
+        *,
+        executor: Executor | None = None,
+        max_workers: int = 4,
+        max_pending: int = 256,
+        max_connections: int = 10_000,
+        recorder=None,
+    ) -> None:
+        """Serve `owners` (matched by exact name).
+
+        Plans run in `executor` (the event loop's default thread pool if
+        None), at most `max_workers` at a time. `max_pending` caps the
+        distinct plans in flight and `max_connections` the open connections;
+        past either, requests get 503. Pass a pawpal_metrics.Recorder as
+        `recorder` to count requests, coalesced requests and rejections and
+        to time each plan.
+        """
+        self.owners = {owner.name: owner for owner in owners}
+        self.executor = executor
+        self.max_pending = max_pending
+        self.max_connections = max_connections
+        self.recorder = recorder
+        self._workers = asyncio.Semaphore(max_workers)
+        # (owner, budget, start, strategy) -> the shared computation for that plan.
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._connections = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        """Start listening; returns the server (port 0 picks a free port)."""
+        return await asyncio.start_server(self._serve_connection, host, port, backlog=4096)
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        """Listen on host:port until cancelled."""
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    # --- Requests ----------------------------------------------------------
+
+    async def handle(self, method: str, target: str) -> tuple[int, object]:
+        """Answer one request; returns (status, JSON-serializable body)."""
+        self._count("service_requests")
+        try:
+            if method != "GET":
+                raise ServiceError(405, f"Method {method} not allowed")
+            url = urlsplit(target)
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            parts = [unquote(part) for part in url.path.strip("/").split("/")]
+            if parts == ["health"]:
+                return 200, {"status": "ok", "owners": len(self.owners), "pending": len(self._inflight)}
+            if len(parts) == 3 and parts[0] == "owners":
+                owner = self.owners.get(parts[1])
+                if owner is None:
+                    raise ServiceError(404, f"Unknown owner {parts[1]!r}")
+                if parts[2] == "plan":
+                    return 200, await self.plan(owner, query)
+                if parts[2] == "tasks":
+                    return 200, self.tasks(owner, query)
+            raise ServiceError(404, f"No route for {url.path}")
+        except ServiceError as exc:
+            if exc.status == 503:
+                self._count("service_requests_rejected")
+            return exc.status, {"error": str(exc)}
+        except Exception as exc:  # answer, rather than drop the connection
+            self._count("service_requests_failed")
+            return 500, {"error": f"{type(exc).__name__}: {exc}"}
+
+    async def plan(self, owner: Owner, query: dict[str, str]) -> dict:
+        """Plan every pet of `owner`, sharing the work with identical requests in flight."""
+        scheduler = self._scheduler_for(owner, query)
+        key = (owner.name, scheduler.available_minutes, scheduler.start_time, scheduler.strategy)
+        future = self._inflight.get(key)
+        if future is None:
+            if len(self._inflight) >= self.max_pending:
+                raise ServiceError(503, "Too many plans in progress; retry shortly")
+            future = self._inflight[key] = asyncio.ensure_future(self._compute(owner, scheduler))
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._count("service_requests_coalesced")
+        # shield: a client hanging up must not cancel a plan others are waiting on.
+        return await asyncio.shield(future)
+
+    def tasks(self, owner: Owner, query: dict[str, str]) -> dict:
+        """Run Owner.find_tasks with the query's filters."""
+        completed = query.get("completed")
+        if completed not in (None, "true", "false"):
+            raise ServiceError(400, f"completed must be true or false, got {completed!r}")
+        due = query.get("due_date")
+        try:
+            due = date.fromisoformat(due) if due else None
+        except ValueError:
+            raise ServiceError(400, f"due_date must be YYYY-MM-DD, got {due!r}") from None
+        pets = owner.pets_named(query.get("pet"))
+        filters = {
+            "completed": None if completed is None else completed == "true",
+            "category": query.get("category"),
+            "due_date": due,
+        }
+        # Per pet (as Owner.find_tasks does), so each task is tagged as it's collected.
+        tasks = [_task_json(pet, task) for pet in pets for task in pet.find_tasks(**filters)]
+        return {"owner": owner.name, "tasks": tasks}
+
+    async def _compute(self, owner: Owner, scheduler: Scheduler) -> dict:
+        """Run _plan_body in the executor, once a worker slot is free."""
+        async with self._workers:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, _plan_body, owner, scheduler)
+
+    def _scheduler_for(self, owner: Owner, query: dict[str, str]) -> Scheduler:
+        """Build the owner's scheduler, with any overrides from the query string."""
+        options = {"recorder": self.recorder}
+        try:
+            if "available_minutes" in query:
+                options["available_minutes"] = min(int(query["available_minutes"]), MAX_AVAILABLE_MINUTES)
+            if "start" in query:
+                options["start_time"] = time.fromisoformat(query["start"])
+        except ValueError:
+            raise ServiceError(400, "available_minutes must be a whole number and start HH:MM") from None
+        if options.get("available_minutes", 0) < 0:
+            raise ServiceError(400, "available_minutes must not be negative")
+        strategy = query.get("strategy", "greedy")
+        if strategy not in PLAN_STRATEGIES:
+            raise ServiceError(400, f"strategy must be one of {', '.join(PLAN_STRATEGIES)}")
+        options["strategy"] = strategy
+        try:
+            if "available_minutes" not in options:
+                return Scheduler.for_owner(owner, **options)
+            options.setdefault("start_time", owner.get_preference("day_start") or time(8, 0))
+            options.setdefault("blocked", owner.get_preference("blocked") or ())
+            return Scheduler(**options)
+        except (TypeError, ValueError) as exc:
+            # The owner's stored preferences don't make a valid scheduler.
+            hint = "" if "available_minutes" in options else "; pass available_minutes"
+            raise ServiceError(400, f"{exc}{hint}") from None
+
+    def _count(self, name: str) -> None:
+        """Bump a recorder counter, if there is a recorder."""
+        if self.recorder is not None:
+            self.recorder.count(name)
+
+    # --- HTTP --------------------------------------------------------------
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer requests on one keep-alive connection until the client is done."""
+        self._connections += 1
+        try:
+            if self._connections > self.max_connections:
+                self._count("service_requests_rejected")
+                await _respond(writer, 503, {"error": "Too many connections; retry shortly"}, keep_alive=False)
+                return
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        return
+                    headers = {}
+                    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    method, target, version = request_line.decode("latin-1").split()
+                    await reader.readexactly(int(headers.get("content-length") or 0))  # bodies are ignored
+                except ValueError:  # includes a line over the reader's limit
+                    await _respond(writer, 400, {"error": "Malformed request"}, keep_alive=False)
+                    return
+
+                status, body = await self.handle(method, target)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                await _respond(writer, status, body, keep_alive=keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections -= 1
+            writer.close()
+
+
+async def _respond(writer: asyncio.StreamWriter, status: int, body: object, *, keep_alive: bool) -> None:
+    """Write one JSON response."""
+    payload = json.dumps(body).encode()
+    head = (
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        + ("Retry-After: 1\r\n" if status == 503 else "")
+        + "\r\n"
+    )
+    writer.write(head.encode("latin-1") + payload)
+    await writer.drain()
+
+
+def _plan_body(owner: Owner, scheduler: Scheduler) -> dict:
+    """Plan every pet of `owner` and render the response body (runs in the executor)."""
+    # max_workers=1: plan inline on the executor's thread, no nested pool.
+    plans = scheduler.build_plans(owner.pets, max_workers=1)
+    return {
+        "owner": owner.name,
+        "available_minutes": scheduler.available_minutes,
+        "start": f"{scheduler.start_time:%H:%M}",
+        "strategy": scheduler.strategy,
+        "pets": [
+            {
+                "pet": pet.name,
+                "total_minutes": plan.total_minutes,
+                "table": plan.to_table(),
+                "skipped": [t.title for t in plan.skipped],
+            }
+            for pet, plan in zip(owner.pets, plans)
+        ],
+    }
+
+
+def _task_json(pet: Pet, task: Task) -> dict:
+    """A task as a JSON object, tagged with its pet."""
+    return {
+        "id": task.id,
+        "pet": pet.name,
+        "title": task.title,
+        "duration_minutes": task.duration_minutes,
+        "priority": task.priority,
+        "category": task.category,
+        "recurrence": task.recurrence,
+        "status": task.status,
+        "due_date": task.due_date and task.due_date.isoformat(),
+        "earliest": task.earliest and f"{task.earliest:%H:%M}",
+        "latest": task.latest and f"{task.latest:%H:%M}",
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Load the task files and serve them until interrupted."""
+    from pawpal_io import format_for, load_owners
+
+    parser = argparse.ArgumentParser(prog="python -m pawpal_service", description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", help="CSV/JSONL task files to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4, help="plans computed at once (default 4)")
+    parser.add_argument("--max-pending", type=int, default=256, help="distinct plans in flight before 503")
+    parser.add_argument("--max-connections", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    owners = []
+    try:
+        for path in args.files:
+            with open(path, newline="") as f:
+                owners = load_owners(f, format_for(path), owners)
+    except (OSError, ValueError) as exc:
+        print(f"pawpal_service: {exc}", file=sys.stderr)
+        return 1
+
+    service = PlanningService(
+        owners, max_workers=args.workers, max_pending=args.max_pending, max_connections=args.max_connections
+    )
+    print(f"Serving {len(owners)} owner(s) on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
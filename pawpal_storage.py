@@ -0,0 +1,385 @@
+"""Persistent storage for PawPal+ owners, pets and tasks.
+
+Two backends:
+
+- SQLiteStore: a SQLite database with batched writes (one transaction and
+  `executemany` per table), a small pool of reusable connections, and
+  `find_tasks` filters run as SQL instead of in Python.
+- write_snapshot / read_snapshot: a compact binary snapshot. Tasks are stored
+  column by column (like TaskStore), and loading memory-maps the file and
+  copies each pet's columns straight into a TaskStore, so big populations
+  load without building a Python object per field.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import queue
+import sqlite3
+import struct
+from array import array
+from contextlib import contextmanager
+from datetime import date, time
+from typing import Iterable, Iterator
+
+from pawpal_system import Owner, Pet, Task, TaskStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS owners (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    preferences TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS pets (
+    id INTEGER PRIMARY KEY,
+    owner_id INTEGER NOT NULL REFERENCES owners(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    species TEXT NOT NULL,
+    breed TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    pet_id INTEGER NOT NULL REFERENCES pets(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    duration_minutes INTEGER NOT NULL,
+    priority TEXT NOT NULL,
+    category TEXT NOT NULL,
+    recurrence TEXT NOT NULL,
+    status TEXT NOT NULL,
+    due_date TEXT,
+    earliest TEXT,
+    latest TEXT
+);
+CREATE INDEX IF NOT EXISTS pets_by_owner ON pets(owner_id, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS tasks_by_pet ON tasks(pet_id, status, category, due_date);
+"""
+
+INSERT_OWNER = "INSERT INTO owners (name, preferences) VALUES (?, ?)"
+INSERT_PET = "INSERT INTO pets (id, owner_id, position, name, species, breed) VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_TASK = (
+    "INSERT INTO tasks (pet_id, position, title, duration_minutes, priority, category, "
+    "recurrence, status, due_date, earliest, latest) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+TASK_COLUMNS = (
+    "t.title, t.duration_minutes, t.priority, t.category, t.recurrence, t.status, "
+    "t.due_date, t.earliest, t.latest"
+)
+
+
+def _encode_preferences(preferences: dict) -> str:
+    """Serialize owner preferences to JSON, tagging times/dates so they round-trip."""
+
+    def default(value):
+        if isinstance(value, time):
+            return {"$time": value.isoformat()}
+        if isinstance(value, date):
+            return {"$date": value.isoformat()}
+        raise TypeError(f"Can't store preference value {value!r}")
+
+    return json.dumps(preferences, default=default)
+
+
+def _decode_preferences(text: str) -> dict:
+    """Inverse of _encode_preferences."""
+
+    def hook(obj: dict):
+        if obj.keys() == {"$time"}:
+            return time.fromisoformat(obj["$time"])
+        if obj.keys() == {"$date"}:
+            return date.fromisoformat(obj["$date"])
+        return obj
+
+    return json.loads(text, object_hook=hook)
+
+
+def _task_from_row(row: tuple) -> Task:
+    """Build a Task from a row of TASK_COLUMNS."""
+    title, duration, priority, category, recurrence, status, due, earliest, latest = row
+    return Task(
+        title=title,
+        duration_minutes=duration,
+        priority=priority,
+        category=category,
+        recurrence=recurrence,
+        status=status,
+        due_date=date.fromisoformat(due) if due else None,
+        earliest=time.fromisoformat(earliest) if earliest else None,
+        latest=time.fromisoformat(latest) if latest else None,
+    )
+
+
+class SQLiteStore:
+    """Owners, pets and tasks in a SQLite database, shared through a connection pool.
+
+    Connections are opened on demand (up to `pool_size`) and handed back to
+    the pool after each call, so repeated calls reuse them along with
+    sqlite3's per-connection cache of prepared statements.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4) -> None:
+        """Open (or create) the database at `path`."""
+        self.path = path
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._opened = 0
+        self._pool_size = pool_size
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection for the length of a `with` block.
+
+        The block runs as one transaction: committed on success, rolled back
+        on error.
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            if self._opened < self._pool_size:
+                conn = self._connect()
+                self._opened += 1
+            else:
+                conn = self._pool.get()  # wait for one to come back
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        """Close every idle pooled connection."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._opened = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection tuned for bulk work."""
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def save_owners(self, owners: Iterable[Owner]) -> None:
+        """Write owners with all their pets and tasks, replacing any saved under the same names.
+
+        Everything goes in one transaction with one `executemany` per table.
+        """
+        owners = list(owners)
+        with self.connection() as conn:
+            conn.executemany("DELETE FROM owners WHERE name = ?", [(o.name,) for o in owners])
+            owner_ids = {
+                o.name: conn.execute(INSERT_OWNER, (o.name, _encode_preferences(o.preferences))).lastrowid
+                for o in owners
+            }
+            next_pet_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM pets").fetchone()[0]
+            pet_rows, task_rows = [], []
+            for owner in owners:
+                for position, pet in enumerate(owner.pets):
+                    pet_id = next_pet_id
+                    next_pet_id += 1
+                    pet_rows.append((pet_id, owner_ids[owner.name], position, pet.name, pet.species, pet.breed))
+                    task_rows.extend(
+                        (
+                            pet_id, i, t.title, t.duration_minutes, t.priority, t.category,
+                            t.recurrence, t.status, t.due_date.isoformat() if t.due_date else None,
+                            f"{t.earliest:%H:%M}" if t.earliest else None,
+                            f"{t.latest:%H:%M}" if t.latest else None,
+                        )
+                        for i, t in enumerate(pet.tasks)
+                    )
+            conn.executemany(INSERT_PET, pet_rows)
+            conn.executemany(INSERT_TASK, task_rows)
+
+    def load_owners(self, names: Iterable[str] | None = None) -> list[Owner]:
+        """Load owners (all, or just the given names) with their pets and tasks."""
+        where, params = "", []
+        if names is not None:
+            params = list(names)
+            where = f"WHERE o.name IN ({','.join('?' * len(params))})"
+        with self.connection() as conn:
+            owners = {
+                owner_id: Owner(name=name, preferences=_decode_preferences(preferences))
+                for owner_id, name, preferences in conn.execute(
+                    f"SELECT o.id, o.name, o.preferences FROM owners o {where} ORDER BY o.id", params
+                )
+            }
+            pet_tasks: dict[int, list[Task]] = {}
+            for row in conn.execute(
+                f"SELECT t.pet_id, {TASK_COLUMNS} FROM tasks t JOIN pets p ON t.pet_id = p.id "
+                f"JOIN owners o ON p.owner_id = o.id {where} ORDER BY t.pet_id, t.position",
+                params,
+            ):
+                pet_tasks.setdefault(row[0], []).append(_task_from_row(row[1:]))
+            for pet_id, owner_id, name, species, breed in conn.execute(
+                "SELECT p.id, p.owner_id, p.name, p.species, p.breed FROM pets p "
+                f"JOIN owners o ON p.owner_id = o.id {where} ORDER BY p.owner_id, p.position",
+                params,
+            ):
+                owners[owner_id].add_pet(
+                    Pet(name=name, species=species, breed=breed, tasks=pet_tasks.get(pet_id, []))
+                )
+        return list(owners.values())
+
+    def find_tasks(
+        self,
+        owner_name: str,
+        *,
+        completed: bool | None = None,
+        pet_name: str | None = None,
+        category: str | None = None,
+        due_date: date | None = None,
+    ) -> list[Task]:
+        """Owner.find_tasks, answered by SQL against the stored data.
+
+        Filters become WHERE clauses (served by the tasks_by_pet index), so
+        only matching rows leave the database. Returns detached Task objects
+        in pet order, then task order.
+        """
+        clauses = ["o.name = ?"]
+        params: list = [owner_name]
+        if completed is not None:
+            clauses.append("t.status = 'complete'" if completed else "t.status != 'complete'")
+        if pet_name is not None:
+            clauses.append("p.name = ? COLLATE NOCASE")
+            params.append(pet_name)
+        if category is not None:
+            clauses.append("t.category = ?")
+            params.append(category)
+        if due_date is not None:
+            clauses.append("t.due_date = ?")
+            params.append(due_date.isoformat())
+        sql = (
+            f"SELECT {TASK_COLUMNS} FROM tasks t JOIN pets p ON t.pet_id = p.id "
+            f"JOIN owners o ON p.owner_id = o.id WHERE {' AND '.join(clauses)} "
+            "ORDER BY p.position, t.position"
+        )
+        with self.connection() as conn:
+            return [_task_from_row(row) for row in conn.execute(sql, params)]
+
+
+# --- Binary snapshots ----------------------------------------------------
+# Layout (little-endian):
+#   header   magic "PAWP", version u16, then u32 counts: strings, owners, pets, tasks
+#   strings  u32 end offset per string, then the UTF-8 bytes
+#   owners   (name id, preferences-JSON id, pet count) u32 each
+#   pets     (name id, species id, breed id, task count) u32 each
+#   tasks    one column at a time: duration i32, due ordinal i32 (0 = none),
+#            earliest/latest minutes i16 (-1 = none), then
+#            title/priority/category/recurrence/status ids u32
+
+SNAPSHOT_MAGIC = b"PAWP"
+SNAPSHOT_VERSION = 2
+_HEADER = struct.Struct("<4sHIIII")
+_OWNER = struct.Struct("<III")
+_PET = struct.Struct("<IIII")
+_LABEL_FIELDS = ("title", "priority", "category", "recurrence", "status")
+
+
+def _minute_of_day(value: time | None) -> int:
+    """Encode an optional time of day as minutes since midnight (-1 = none)."""
+    return -1 if value is None else value.hour * 60 + value.minute
+
+
+def write_snapshot(owners: Iterable[Owner], path: str) -> None:
+    """Write owners, pets and tasks to a compact binary snapshot file."""
+    strings: list[str] = []
+    string_ids: dict[str, int] = {}
+
+    def sid(text: str) -> int:
+        if text not in string_ids:
+            string_ids[text] = len(strings)
+            strings.append(text)
+        return string_ids[text]
+
+    owner_recs, pet_recs = array("I"), array("I")
+    durations, due = array("i"), array("i")
+    earliest, latest = array("h"), array("h")
+    label_ids = {name: array("I") for name in _LABEL_FIELDS}
+    n_owners = n_pets = 0
+    for owner in owners:
+        owner_recs.extend((sid(owner.name), sid(_encode_preferences(owner.preferences)), len(owner.pets)))
+        n_owners += 1
+        for pet in owner.pets:
+            pet_recs.extend((sid(pet.name), sid(pet.species), sid(pet.breed), len(pet.tasks)))
+            n_pets += 1
+            for task in pet.tasks:
+                durations.append(task.duration_minutes)
+                due.append(task.due_date.toordinal() if task.due_date else 0)
+                earliest.append(_minute_of_day(task.earliest))
+                latest.append(_minute_of_day(task.latest))
+                for name in _LABEL_FIELDS:
+                    label_ids[name].append(sid(getattr(task, name)))
+
+    encoded = [text.encode("utf-8") for text in strings]
+    ends, offset = array("I"), 0
+    for chunk in encoded:
+        offset += len(chunk)
+        ends.append(offset)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(strings), n_owners, n_pets, len(durations)))
+        columns = (ends, b"".join(encoded), owner_recs, pet_recs, durations, due, earliest, latest)
+        for column in (*columns, *label_ids.values()):
+            f.write(column if isinstance(column, bytes) else column.tobytes())
+
+
+def read_snapshot(path: str) -> list[Owner]:
+    """Load a snapshot through a memory map; each pet's tasks come back in a TaskStore.
+
+    Column slices are copied straight from the mapped file into typed arrays,
+    and all stores share one string table, so no per-field Python objects are
+    created for the tasks.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, version, n_strings, n_owners, n_pets, n_tasks = _HEADER.unpack_from(mm, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is not a PawPal+ snapshot (version {SNAPSHOT_VERSION})")
+        pos = _HEADER.size
+
+        def take(typecode: str, count: int) -> array:
+            nonlocal pos
+            column = array(typecode)
+            column.frombytes(mm[pos:pos + count * column.itemsize])
+            pos += count * column.itemsize
+            return column
+
+        ends = take("I", n_strings)
+        blob = bytes(mm[pos:pos + (ends[-1] if n_strings else 0)])
+        pos += len(blob)
+        strings = [blob[a:b].decode("utf-8") for a, b in zip([0, *ends[:-1]], ends)]
+
+        owner_recs = take("I", n_owners * 3)
+        pet_recs = take("I", n_pets * 4)
+        durations = take("i", n_tasks)
+        due = take("i", n_tasks)
+        earliest = take("h", n_tasks)
+        latest = take("h", n_tasks)
+        label_ids = {name: take("I", n_tasks) for name in _LABEL_FIELDS}
+
+    owners = []
+    pet_index = task_start = 0
+    for o in range(n_owners):
+        name_id, prefs_id, pet_count = owner_recs[o * 3:o * 3 + 3]
+        owner = Owner(name=strings[name_id], preferences=_decode_preferences(strings[prefs_id]))
+        for p in range(pet_index, pet_index + pet_count):
+            pet_name, species, breed, task_count = pet_recs[p * 4:p * 4 + 4]
+            end = task_start + task_count
+            store = TaskStore.from_columns(
+                durations=durations[task_start:end],
+                due_ordinals=due[task_start:end],
+                earliest=earliest[task_start:end],
+                latest=latest[task_start:end],
+                label_ids={name: ids[task_start:end] for name, ids in label_ids.items()},
+                labels=strings,
+            )
+            owner.add_pet(Pet(name=strings[pet_name], species=strings[species], breed=strings[breed], tasks=store))
+            task_start = end
+        pet_index += pet_count
+        owners.append(owner)
+    return owners
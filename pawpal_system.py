@@ -7,12 +7,31 @@ into an ordered daily plan.
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from datetime import date, datetime, time, timedelta
+import bisect
+import functools
+import heapq
+import itertools
+import operator
+import sys
+import threading
+import time as clock
+import weakref
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, MutableSequence, Sequence
+from dataclasses import dataclass, field, replace
+from datetime import date, time, timedelta
 
 # Priority labels mapped to a sortable rank (higher = more important).
 PRIORITY_RANKS = {"low": 1, "medium": 2, "high": 3}
 
+# Planning strategies Scheduler.build_plan can use: "greedy" packs by priority
+# order; "optimal" solves a 0/1 knapsack over the minute budget.
+PLAN_STRATEGIES = ("greedy", "optimal")
+
+# Plan slots are whole minutes since midnight; a day has this many.
+MINUTES_PER_DAY = 24 * 60
+
 # How far ahead each recurrence rule schedules the next occurrence.
 # timedelta does the calendar math (month/year/leap-year rollover) for us.
 RECURRENCE_DELTAS = {
@@ -20,10 +39,25 @@ RECURRENCE_DELTAS = {
     "weekly": timedelta(weeks=1),  # weeks=1 is exactly 7 days
 }
 
+# Where an undated recurring task's series is counted from, so occurrences
+# and is_due_on agree on its days: every day if daily, Mondays if weekly.
+RECURRENCE_EPOCH = date(1, 1, 1)  # a Monday
 
-@dataclass
+# Source of Task.id values: unique for the life of the process.
+_task_ids = itertools.count(1)
+
+# Serializes Pet._indexed's first build, so threads planning the same pet
+# (build_plans, pawpal_service) can't see or build a half-filled index.
+_INDEX_LOCK = threading.Lock()
+
+
+@dataclass(slots=True)
 class Task:
-    """A single pet-care action to be scheduled."""
+    """A single pet-care action to be scheduled.
+
+    Slotted (no per-instance __dict__) to keep large task lists small; for
+    really big populations see TaskStore.
+    """
 
     title: str
     duration_minutes: int
@@ -32,6 +66,13 @@ class Task:
     recurrence: str = "none"  # "none" | "daily" | "weekly"
     status: str = "pending"  # "pending" | "complete"
     due_date: date | None = None
+    # Optional time window: the task may start no earlier than `earliest`
+    # and must finish by `latest` ("walk between 07:00 and 09:00").
+    earliest: time | None = None
+    latest: time | None = None
+    # Stable identifier (unlike a list position, it survives edits to the
+    # task list). Not part of equality: two tasks with the same fields match.
+    id: int = field(default_factory=_task_ids.__next__, compare=False, kw_only=True)
 
     def mark_complete(self) -> Task | None:
         """Mark this task as done; return the next occurrence if it recurs.
@@ -62,8 +103,47 @@ class Task:
             recurrence=self.recurrence,
             status="pending",
             due_date=base + delta,
+            earliest=self.earliest,
+            latest=self.latest,
         )
 
+    def occurrences(self, start: date, end: date) -> Iterator[date]:
+        """Lazily yield each date this task falls due in the window start..end (inclusive).
+
+        Recurring tasks repeat every RECURRENCE_DELTAS interval from their
+        due_date (or from RECURRENCE_EPOCH if they have none), however far
+        back that was, so a missed week doesn't lose the following
+        occurrences. Dates are
+        computed on demand; no Task copies are made. A one-off task yields its
+        due_date if it's in the window.
+        """
+        delta = RECURRENCE_DELTAS.get(self.recurrence)
+        if delta is None:
+            if self.due_date is not None and start <= self.due_date <= end:
+                yield self.due_date
+            return
+        day = self.due_date or RECURRENCE_EPOCH
+        if day < start:
+            # Jump straight to the first occurrence on/after start.
+            periods = -(-(start - day).days // delta.days)
+            day += delta * periods
+        while day <= end:
+            yield day
+            day += delta
+
+    def is_due_on(self, day: date) -> bool:
+        """Return True if this task (or its recurring series) falls due on `day`.
+
+        O(1): a recurring task is due on any day a whole number of intervals
+        on/after its due_date (or RECURRENCE_EPOCH if undated), the same days
+        occurrences yields.
+        """
+        delta = RECURRENCE_DELTAS.get(self.recurrence)
+        if delta is None:
+            return self.due_date == day
+        days = (day - (self.due_date or RECURRENCE_EPOCH)).days
+        return days >= 0 and days % delta.days == 0
+
     def is_complete(self) -> bool:
         """Return True if this task has been completed."""
         return self.status == "complete"
@@ -77,6 +157,733 @@ class Task:
         return PRIORITY_RANKS.get(self.priority.lower(), PRIORITY_RANKS["medium"])
 
 
+@dataclass(frozen=True, slots=True)
+class TaskTemplate:
+    """The shared, immutable part of a recurring task: what it is, not when.
+
+    One template is shared by every occurrence it describes, so a year of
+    daily meds stores the title, duration, etc. once. Change a series with
+    TaskSeries.revise rather than editing a template.
+    """
+
+    title: str
+    duration_minutes: int
+    priority: str = "medium"
+    category: str = "general"
+    recurrence: str = "none"
+    earliest: time | None = None
+    latest: time | None = None
+
+
+# Task fields that come from a TaskTemplate (the rest are per occurrence).
+TEMPLATE_FIELDS = ("title", "duration_minutes", "priority", "category", "recurrence", "earliest", "latest")
+
+
+class TaskSeries:
+    """A recurring task as a dated history of templates, plus its occurrences.
+
+    Each revision takes effect from a date: an occurrence reads its fields
+    from the revision in force on its due date, so revising the series
+    changes every occurrence due from then on at once, with no per-occurrence
+    rewrites, while earlier occurrences keep their old values.
+    """
+
+    def __init__(self, template: TaskTemplate) -> None:
+        """Start a series whose first revision applies from the beginning of time."""
+        self._starts: list[date] = [date.min]  # sorted effective dates, for bisect
+        self._templates: list[TaskTemplate] = [template]
+        # Occurrences someone observes (e.g. a pet's index), told about revisions.
+        self._watched: weakref.WeakValueDictionary[int, Occurrence] = weakref.WeakValueDictionary()
+
+    @property
+    def template(self) -> TaskTemplate:
+        """The latest revision."""
+        return self._templates[-1]
+
+    def template_on(self, day: date | None) -> TaskTemplate:
+        """Return the revision in force on `day` (the latest one for None)."""
+        if day is None:
+            return self._templates[-1]
+        return self._templates[bisect.bisect_right(self._starts, day) - 1]
+
+    def revise(self, effective: date, **changes) -> TaskTemplate:
+        """Change template fields for occurrences due on or after `effective`.
+
+        Later revisions get the same changes, so the edit holds for every
+        future occurrence. Returns the revision now in force on `effective`.
+        """
+        unknown = set(changes) - set(TEMPLATE_FIELDS)
+        if unknown:
+            raise ValueError(f"Not template fields: {', '.join(sorted(unknown))}")
+        position = bisect.bisect_left(self._starts, effective)
+        if position == len(self._starts) or self._starts[position] != effective:
+            self._starts.insert(position, effective)
+            self._templates.insert(position, self._templates[position - 1])
+        watched = [(o, o.series.template_on(o.due_date)) for o in self._watched.values() if o._own is None]
+        for i in range(position, len(self._templates)):
+            self._templates[i] = replace(self._templates[i], **changes)
+        for occurrence, before in watched:
+            for name in changes:
+                old = getattr(before, name)
+                if getattr(occurrence, name) != old:
+                    for observer in occurrence._observers:
+                        observer(occurrence, name, old)
+        return self._templates[position]
+
+    def _watch(self, occurrence: Occurrence) -> None:
+        """Track `occurrence` for revision updates while it has observers."""
+        if occurrence._observers:
+            self._watched[id(occurrence)] = occurrence
+        else:
+            self._watched.pop(id(occurrence), None)
+
+    def occurrence(self, due_date: date | None = None, status: str = "pending") -> Occurrence:
+        """Create an occurrence of this series due on `due_date`."""
+        return Occurrence(self, due_date, status)
+
+
+def _template_field(name: str) -> property:
+    """Build an Occurrence property that reads a template field (writes copy it first)."""
+
+    def getter(self: Occurrence):
+        return getattr(self._own or self._series.template_on(self.due_date), name)
+
+    def setter(self: Occurrence, value) -> None:
+        # Copy-on-write: this occurrence gets its own template; the series
+        # and its other occurrences are untouched.
+        self._own = replace(self._own or self._series.template_on(self.due_date), **{name: value})
+
+    return property(getter, setter, doc=f"{name} from the template in force on the due date.")
+
+
+class Occurrence:
+    """One dated instance of a TaskSeries that acts like a Task.
+
+    Holds just the series, due date, status and id; every other field is
+    read from the series' template for the due date. Setting one of those
+    fields detaches this occurrence onto a private template copy.
+    """
+
+    __slots__ = ("_series", "_own", "due_date", "status", "id", "_watchers", "__weakref__")
+
+    def __init__(self, series: TaskSeries, due_date: date | None = None, status: str = "pending") -> None:
+        """Create an occurrence of `series`."""
+        object.__setattr__(self, "_watchers", ())
+        object.__setattr__(self, "_series", series)
+        object.__setattr__(self, "_own", None)  # private template once a field is edited
+        object.__setattr__(self, "due_date", due_date)
+        object.__setattr__(self, "status", status)
+        object.__setattr__(self, "id", _task_ids.__next__())
+
+    title = _template_field("title")
+    duration_minutes = _template_field("duration_minutes")
+    priority = _template_field("priority")
+    category = _template_field("category")
+    recurrence = _template_field("recurrence")
+    earliest = _template_field("earliest")
+    latest = _template_field("latest")
+
+    @property
+    def series(self) -> TaskSeries:
+        """The series this occurrence belongs to."""
+        return self._series
+
+    @property
+    def _observers(self) -> tuple:
+        """Change callbacks run as observer(occurrence, field_name, old_value).
+
+        The series notifies them of revisions too, since a revision changes
+        this occurrence's fields without anyone assigning to them; pets use
+        this to keep their indexes current.
+        """
+        return self._watchers
+
+    @_observers.setter
+    def _observers(self, value: tuple) -> None:
+        object.__setattr__(self, "_watchers", value)
+        self._series._watch(self)
+
+    def next_occurrence(self, *, from_date: date | None = None) -> Occurrence | None:
+        """Create the series' next pending occurrence (None if it doesn't recur).
+
+        Like Task.next_occurrence, but the follow-up is another lightweight
+        occurrence that reads from the series (not from any private copy).
+        """
+        delta = RECURRENCE_DELTAS.get(self.recurrence)
+        if delta is None:
+            return None
+        base = self.due_date or from_date or date.today()
+        return Occurrence(self._series, base + delta)
+
+    def priority_rank(self) -> int:
+        """Map priority to a sortable number (higher = more important)."""
+        return PRIORITY_RANKS.get(self.priority.lower(), PRIORITY_RANKS["medium"])
+
+    def __setattr__(self, name: str, value) -> None:
+        """Set a field, then tell any observers what changed."""
+        observers = () if name[0] == "_" else self._watchers
+        old = getattr(self, name) if observers else None
+        object.__setattr__(self, name, value)
+        if observers and old != value:
+            for observer in observers:
+                observer(self, name, old)
+
+    # Everything else only reads the fields above, so share Task's versions.
+    mark_complete = Task.mark_complete
+    is_complete = Task.is_complete
+    is_recurring = Task.is_recurring
+    occurrences = Task.occurrences
+    is_due_on = Task.is_due_on
+
+    def to_task(self) -> Task:
+        """Copy this occurrence out into a standalone Task (same id)."""
+        template = self._own or self._series.template_on(self.due_date)
+        return Task(
+            **{name: getattr(template, name) for name in TEMPLATE_FIELDS},
+            status=self.status,
+            due_date=self.due_date,
+            id=self.id,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare by field values, like Task does."""
+        if isinstance(other, Task):
+            return self.to_task() == other
+        if isinstance(other, (Occurrence, StoredTask)):
+            return self.to_task() == other.to_task()
+        return NotImplemented
+
+    __hash__ = None  # mutable, like Task
+
+    def __repr__(self) -> str:
+        """Show the occurrence like a Task repr."""
+        return repr(self.to_task()).replace("Task(", "Occurrence(", 1)
+
+
+class _LabelColumn:
+    """A string column stored as small integer ids into a table of interned labels."""
+
+    __slots__ = ("ids", "labels", "_lookup")
+
+    def __init__(self, typecode: str = "H") -> None:
+        """Start an empty column whose ids use the given array typecode."""
+        self.ids = array(typecode)
+        self.labels: list[str] = []
+        self._lookup: dict[str, int] | None = {}
+
+    def encode(self, label: str) -> int:
+        """Return the id for `label`, adding it to the table on first sight."""
+        if self._lookup is None:  # table was handed in by TaskStore.from_columns
+            self._lookup = {text: i for i, text in enumerate(self.labels)}
+        label_id = self._lookup.get(label)
+        if label_id is None:
+            label_id = len(self.labels)
+            label = sys.intern(label)
+            self.labels.append(label)
+            self._lookup[label] = label_id
+        return label_id
+
+    def find(self, label: str) -> int | None:
+        """Return the id of `label`, or None if no row has ever held it."""
+        if self._lookup is None:
+            self._lookup = {text: i for i, text in enumerate(self.labels)}
+        return self._lookup.get(label)
+
+    def get(self, row: int) -> str:
+        """Return the label stored at a row."""
+        return self.labels[self.ids[row]]
+
+    def set(self, row: int, label: str) -> None:
+        """Overwrite the label stored at a row."""
+        self.ids[row] = self.encode(label)
+
+
+class TaskStore(MutableSequence):
+    """Struct-of-arrays storage for large task populations.
+
+    Each field lives in a compact typed `array`: durations, priority ranks,
+    due dates (as ordinals, 0 = none) and time windows (minutes since
+    midnight, -1 = none) are plain integers, and the string fields
+    (title, priority, category, recurrence, status) are ids into tables of
+    interned labels, so a million "daily" tasks share one "daily" string.
+
+    It behaves like a list of tasks, so it can back `Pet.tasks` directly
+    (`Pet("Mochi", "dog", tasks=TaskStore())`). Appending copies a task's
+    fields into the columns; reading hands out a lightweight StoredTask view
+    that reads and writes those columns and supports the Task API. Views are
+    cached while in use, so the same position yields the same view object.
+    """
+
+    def __init__(self, tasks: Iterable[Task] = ()) -> None:
+        """Create a store, optionally loading an initial batch of tasks."""
+        self._durations = array("i")
+        self._ranks = array("b")
+        self._due = array("i")
+        self._earliest = array("h")
+        self._latest = array("h")
+        self._ids = array("q")
+        self._titles = _LabelColumn("I")
+        self._priorities = _LabelColumn()
+        self._categories = _LabelColumn()
+        self._recurrences = _LabelColumn()
+        self._statuses = _LabelColumn()
+        # Position -> physical row. Deleting a task only drops its position,
+        # so views of other tasks never move to a different row.
+        self._order = array("i")
+        self._free: list[int] = []
+        # Rows at more than one position (row -> count), after a view of this
+        # store was assigned to a position, and rows no position refers to that
+        # a view still holds (so they can be assigned back, as in a swap).
+        self._shared: dict[int, int] = {}
+        self._detached: set[int] = set()
+        # Task.id -> live row, built on the first index_of_id (see _id_rows).
+        self._rows_by_id: dict[int, int] | None = None
+        self._views: weakref.WeakValueDictionary[int, StoredTask] = weakref.WeakValueDictionary()
+        self.extend(tasks)
+
+    @classmethod
+    def from_columns(
+        cls,
+        *,
+        durations: array,
+        due_ordinals: array,
+        label_ids: dict[str, array],
+        labels: list[str],
+        earliest: array | None = None,
+        latest: array | None = None,
+    ) -> TaskStore:
+        """Build a store straight from ready-made columns, without per-task appends.
+
+        `label_ids` maps "title", "priority", "category", "recurrence" and
+        "status" to arrays of ids into the shared `labels` table (several
+        stores may share one table). `earliest`/`latest` are window minutes
+        (-1 = none); omitted, no task has a window. Used for bulk loads such
+        as snapshots.
+        """
+        store = cls()
+        store._durations = durations
+        store._due = due_ordinals
+        store._ids = array("q", itertools.islice(_task_ids, len(durations)))  # fresh ids
+        no_window = array("h", [-1]) * len(durations)
+        store._earliest = earliest if earliest is not None else no_window
+        store._latest = latest if latest is not None else array("h", no_window)
+        for name, column in (
+            ("title", store._titles),
+            ("priority", store._priorities),
+            ("category", store._categories),
+            ("recurrence", store._recurrences),
+            ("status", store._statuses),
+        ):
+            column.ids = label_ids[name]
+            column.labels = labels
+            column._lookup = None  # built on first write
+        rank_of = {
+            i: PRIORITY_RANKS.get(labels[i].lower(), PRIORITY_RANKS["medium"])
+            for i in set(label_ids["priority"])
+        }
+        store._ranks = array("b", [rank_of[i] for i in label_ids["priority"]])
+        store._order = array("i", range(len(durations)))
+        return store
+
+    def __len__(self) -> int:
+        """Return the number of live tasks."""
+        return len(self._order)
+
+    def __getitem__(self, index):
+        """Return the task view at a position (or a list of views for a slice)."""
+        if isinstance(index, slice):
+            return [self._view(row) for row in self._order[index]]
+        return self._view(self._order[index])
+
+    def __iter__(self) -> Iterator[StoredTask]:
+        """Yield a view of each task in order."""
+        for row in self._order:
+            yield self._view(row)
+
+    def __setitem__(self, index, task) -> None:
+        """Put a task (or, for a slice, tasks) at a position.
+
+        A view of this store is placed as itself, like an object in a list,
+        so swaps and reverse() move rows instead of copying live values; any
+        other task has its fields copied into the position's row.
+        """
+        if isinstance(index, slice):
+            tasks = list(task)
+            positions = range(len(self._order))[index]
+            if index.step not in (None, 1):
+                if len(tasks) != len(positions):
+                    raise ValueError(
+                        f"attempt to assign sequence of size {len(tasks)} to extended slice of size {len(positions)}"
+                    )
+                for position, item in zip(positions, tasks):
+                    self[position] = item
+                return
+            del self[index]
+            for offset, item in enumerate(tasks):
+                self.insert(positions.start + offset, item)
+            return
+        if isinstance(task, StoredTask) and task._store is self:
+            displaced = self._order[index]
+            if displaced != task._row:
+                self._adopt(task._row)
+                self._order[index] = task._row
+                self._release(displaced)
+        else:
+            self._write(self._order[index], task)
+
+    def __delitem__(self, index) -> None:
+        """Remove the task(s) at a position or slice; rows are reused once no view holds them."""
+        rows = self._order[index] if isinstance(index, slice) else (self._order[index],)
+        del self._order[index]
+        for row in rows:
+            self._release(row)
+
+    def _adopt(self, row: int) -> None:
+        """Count one more position referring to a row of this store."""
+        if row in self._detached:
+            self._detached.discard(row)
+            if self._rows_by_id is not None:
+                self._rows_by_id[self._ids[row]] = row
+        else:
+            self._shared[row] = self._shared.get(row, 1) + 1
+
+    def _release(self, row: int) -> None:
+        """Count one fewer position referring to a row, retiring it at none."""
+        count = self._shared.get(row)
+        if count is not None:
+            if count > 2:
+                self._shared[row] = count - 1
+            else:
+                del self._shared[row]
+            return
+        if self._rows_by_id is not None and self._rows_by_id.get(self._ids[row]) == row:
+            del self._rows_by_id[self._ids[row]]
+        if row in self._views:
+            self._detached.add(row)
+        else:
+            self._free.append(row)
+
+    def insert(self, index: int, task: Task) -> None:
+        """Copy a task's fields into the store at a position."""
+        self._order.insert(index, self._new_row(task))
+
+    def append(self, task: Task) -> None:
+        """Copy a task's fields onto the end of the store (no list shifting)."""
+        self._order.append(self._new_row(task))
+
+    def _new_row(self, task: Task) -> int:
+        """Allocate a physical row (reusing a freed one if possible) holding `task`."""
+        if self._free:
+            row = self._free.pop()
+            self._write(row, task)
+            return row
+        row = len(self._durations)
+        self._durations.append(task.duration_minutes)
+        self._ranks.append(task.priority_rank())
+        self._due.append(task.due_date.toordinal() if task.due_date else 0)
+        self._earliest.append(_window_minute(task.earliest))
+        self._latest.append(_window_minute(task.latest))
+        self._ids.append(task.id)
+        if self._rows_by_id is not None:
+            self._rows_by_id[task.id] = row
+        self._titles.ids.append(self._titles.encode(task.title))
+        self._priorities.ids.append(self._priorities.encode(task.priority))
+        self._categories.ids.append(self._categories.encode(task.category))
+        self._recurrences.ids.append(self._recurrences.encode(task.recurrence))
+        self._statuses.ids.append(self._statuses.encode(task.status))
+        return row
+
+    def _write(self, row: int, task: Task) -> None:
+        """Overwrite every column of a physical row from a task."""
+        self._durations[row] = task.duration_minutes
+        self._ranks[row] = task.priority_rank()
+        self._due[row] = task.due_date.toordinal() if task.due_date else 0
+        self._earliest[row] = _window_minute(task.earliest)
+        self._latest[row] = _window_minute(task.latest)
+        self._set_id(row, task.id)
+        self._titles.set(row, task.title)
+        self._priorities.set(row, task.priority)
+        self._categories.set(row, task.category)
+        self._recurrences.set(row, task.recurrence)
+        self._statuses.set(row, task.status)
+
+    def _set_id(self, row: int, task_id: int) -> None:
+        """Store a row's Task.id, keeping the id -> row map current."""
+        if self._rows_by_id is not None:
+            if self._rows_by_id.get(self._ids[row]) == row:
+                del self._rows_by_id[self._ids[row]]
+            self._rows_by_id[task_id] = row
+        self._ids[row] = task_id
+
+    def index_of_id(self, task_id: int) -> int:
+        """Return the position of the task with this id (ValueError if absent).
+
+        The row comes from an id -> row dict (so rows of removed tasks are
+        never matched) and its position from a scan of the typed order
+        array, so no views are made.
+        """
+        row = self._id_rows().get(task_id)
+        if row is None:
+            raise ValueError(f"No task with id {task_id}")
+        return self._order.index(row)
+
+    def get_task(self, task_id: int) -> StoredTask:
+        """Return the view of the task with this id (KeyError if absent)."""
+        row = self._id_rows().get(task_id)
+        if row is None:
+            raise KeyError(f"No task with id {task_id}")
+        return self._view(row)
+
+    def find(
+        self,
+        *,
+        completed: bool | None = None,
+        category: str | None = None,
+        due_date: date | None = None,
+    ) -> list[StoredTask]:
+        """Return views of the tasks matching every given filter, in order.
+
+        Answered by scanning the status/category/due-date columns, so a
+        query keeps no per-task state between calls (compare Pet.find_tasks).
+        """
+        rows = self._order
+        if completed is not None:
+            done, statuses = self._statuses.find("complete"), self._statuses.ids
+            rows = [row for row in rows if (statuses[row] == done) is completed]
+        if category is not None:
+            wanted, categories = self._categories.find(category), self._categories.ids
+            rows = [row for row in rows if categories[row] == wanted] if wanted is not None else []
+        if due_date is not None:
+            ordinal, due = due_date.toordinal(), self._due
+            rows = [row for row in rows if due[row] == ordinal]
+        return [self._view(row) for row in rows]
+
+    def by_priority(self) -> list[StoredTask]:
+        """Views in Scheduler.sort_by_priority order, sorted on the rank/duration columns."""
+        ranks, durations = self._ranks, self._durations
+        rows = sorted(self._order, key=lambda row: (-ranks[row], durations[row]))
+        return [self._view(row) for row in rows]
+
+    def _id_rows(self) -> dict[int, int]:
+        """Return the Task.id -> row map, building it from the live rows on first use."""
+        if self._rows_by_id is None:
+            ids = self._ids
+            self._rows_by_id = {ids[row]: row for row in self._order}
+        return self._rows_by_id
+
+    def _view(self, row: int) -> StoredTask:
+        """Return the (cached) view for a physical row."""
+        view = self._views.get(row)
+        if view is None:
+            view = StoredTask(self, row)
+            self._views[row] = view
+        return view
+
+
+def _window_minute(value: time | None) -> int:
+    """Encode a window bound as minutes since midnight (-1 = none)."""
+    return -1 if value is None else _to_minutes(value)
+
+
+def _window_column(name: str, doc: str) -> property:
+    """Build a StoredTask property for a window-bound column of its store."""
+
+    def getter(self: StoredTask) -> time | None:
+        minute = getattr(self._store, name)[self._row]
+        return None if minute < 0 else _TIMES_OF_DAY[minute]
+
+    def setter(self: StoredTask, value: time | None) -> None:
+        getattr(self._store, name)[self._row] = _window_minute(value)
+
+    return property(getter, setter, doc=doc)
+
+
+def _column(name: str, doc: str) -> property:
+    """Build a StoredTask property that reads/writes a _LabelColumn of its store."""
+
+    def getter(self: StoredTask) -> str:
+        return getattr(self._store, name).get(self._row)
+
+    def setter(self: StoredTask, value: str) -> None:
+        getattr(self._store, name).set(self._row, value)
+
+    return property(getter, setter, doc=doc)
+
+
+class StoredTask:
+    """A lightweight view of one row in a TaskStore that acts like a Task."""
+
+    __slots__ = ("_store", "_row", "__weakref__")
+
+    def __init__(self, store: TaskStore, row: int) -> None:
+        """Point the view at a physical row of a store."""
+        self._store = store
+        self._row = row
+
+    title = _column("_titles", "Task title.")
+    category = _column("_categories", "Task category.")
+    recurrence = _column("_recurrences", "Recurrence rule.")
+    status = _column("_statuses", "Completion status.")
+
+    @property
+    def priority(self) -> str:
+        """Priority label; setting it also refreshes the stored rank."""
+        return self._store._priorities.get(self._row)
+
+    @priority.setter
+    def priority(self, value: str) -> None:
+        self._store._priorities.set(self._row, value)
+        self._store._ranks[self._row] = PRIORITY_RANKS.get(value.lower(), PRIORITY_RANKS["medium"])
+
+    @property
+    def id(self) -> int:
+        """Stable task id (see Task.id)."""
+        return self._store._ids[self._row]
+
+    @id.setter
+    def id(self, value: int) -> None:
+        self._store._set_id(self._row, value)
+
+    @property
+    def duration_minutes(self) -> int:
+        """Task length in minutes."""
+        return self._store._durations[self._row]
+
+    @duration_minutes.setter
+    def duration_minutes(self, value: int) -> None:
+        self._store._durations[self._row] = value
+
+    @property
+    def due_date(self) -> date | None:
+        """Due date, or None if the task has none."""
+        ordinal = self._store._due[self._row]
+        return date.fromordinal(ordinal) if ordinal else None
+
+    @due_date.setter
+    def due_date(self, value: date | None) -> None:
+        self._store._due[self._row] = value.toordinal() if value else 0
+
+    earliest = _window_column("_earliest", "Earliest start time, or None.")
+    latest = _window_column("_latest", "Latest finish time, or None.")
+
+    def priority_rank(self) -> int:
+        """Return the precomputed priority rank (no string work)."""
+        return self._store._ranks[self._row]
+
+    # The rest of the Task API only touches the attributes above, so the
+    # views share Task's own implementations.
+    mark_complete = Task.mark_complete
+    next_occurrence = Task.next_occurrence
+    is_complete = Task.is_complete
+    is_recurring = Task.is_recurring
+    occurrences = Task.occurrences
+    is_due_on = Task.is_due_on
+
+    def to_task(self) -> Task:
+        """Copy this row out into a standalone Task."""
+        return Task(
+            title=self.title,
+            duration_minutes=self.duration_minutes,
+            priority=self.priority,
+            category=self.category,
+            recurrence=self.recurrence,
+            status=self.status,
+            due_date=self.due_date,
+            earliest=self.earliest,
+            latest=self.latest,
+            id=self.id,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare by field values, like Task does (views and Tasks can be equal)."""
+        if isinstance(other, (Task, StoredTask)):
+            return self.to_task() == (other.to_task() if isinstance(other, StoredTask) else other)
+        return NotImplemented
+
+    __hash__ = None  # mutable, like Task
+
+    def __repr__(self) -> str:
+        """Show the row like a Task repr."""
+        return repr(self.to_task()).replace("Task(", "StoredTask(", 1)
+
+
+class _TaskIndex:
+    """Buckets a pet's tasks by status, category, due date and recurrence.
+
+    Each bucket is an insertion-ordered dict of id(task) -> task, so adding,
+    removing and re-filing a task are all O(1). `by_id` maps each Task.id to
+    its task. Tasks are filed under the values they had when added, so an
+    edit made directly to a task needs a refile (see Pet.reindex).
+
+    `by_rank` keeps the tasks in Scheduler.sort_by_priority order: one list
+    per priority rank (highest first), each sorted by (duration, arrival) so
+    equal tasks stay in list order. Entries are (duration, seq, task) and
+    inserts/removals are a bisect plus a list shift.
+    """
+
+    FIELDS = ("status", "category", "due_date", "recurrence")
+    ORDER_FIELDS = ("priority", "duration_minutes")
+
+    def __init__(self) -> None:
+        """Start with an empty bucket map per indexed field."""
+        self.buckets: dict[str, dict] = {name: {} for name in self.FIELDS}
+        self.by_id: dict[int, Task] = {}
+        self.by_rank: dict[int, list[tuple]] = {
+            rank: [] for rank in sorted(set(PRIORITY_RANKS.values()), reverse=True)
+        }
+        # id(task) -> (field values, Task.id, rank, duration, seq) as filed.
+        self._filed: dict[int, tuple] = {}
+        self._seq = itertools.count()
+
+    def add(self, task: Task, seq: int | None = None) -> None:
+        """File a task under its current field values (last, unless given a seq)."""
+        values = tuple(getattr(task, name) for name in self.FIELDS)
+        for name, value in zip(self.FIELDS, values):
+            self.buckets[name].setdefault(value, {})[id(task)] = task
+        self.by_id[task.id] = task
+        rank, duration = task.priority_rank(), task.duration_minutes
+        if seq is None:
+            seq = next(self._seq)
+        bisect.insort(self.by_rank[rank], (duration, seq, task))
+        self._filed[id(task)] = (values, task.id, rank, duration, seq)
+
+    def remove(self, task: Task) -> int:
+        """Drop a task from wherever it was filed; return its arrival seq."""
+        values, task_id, rank, duration, seq = self._filed.pop(id(task))
+        for name, value in zip(self.FIELDS, values):
+            self._discard(name, value, task)
+        if self.by_id.get(task_id) is task:
+            del self.by_id[task_id]
+        entries = self.by_rank[rank]
+        del entries[bisect.bisect_left(entries, (duration, seq))]
+        return seq
+
+    def refile(self, task: Task) -> None:
+        """File a task again under its current values, keeping its place among equals."""
+        self.add(task, self.remove(task))
+
+    def by_priority(self) -> list[Task]:
+        """Every task in sort_by_priority order, read straight off the rank lists."""
+        return list(map(operator.itemgetter(2), itertools.chain.from_iterable(self.by_rank.values())))
+
+    def in_list_order(self, tasks: list[Task]) -> list[Task]:
+        """Sort indexed tasks back into the order they were added (list order)."""
+        filed = self._filed
+        return sorted(tasks, key=lambda task: filed[id(task)][4])
+
+    def lookup(self, name: str, value) -> dict:
+        """Return the bucket for one field value (empty if none)."""
+        return self.buckets[name].get(value, {})
+
+    def _discard(self, name: str, value, task: Task) -> None:
+        """Remove a task from one bucket, dropping the bucket once empty."""
+        bucket = self.buckets[name].get(value)
+        if bucket is not None:
+            bucket.pop(id(task), None)
+            if not bucket:
+                del self.buckets[name][value]
+
+
 @dataclass
 class Pet:
     """An animal being cared for."""
@@ -85,14 +892,24 @@ class Pet:
     species: str  # dog | cat | other
     breed: str = ""
     tasks: list[Task] = field(default_factory=list)
+    # Built on the first query (see _indexed), so bulk-loaded pets that are
+    # never queried don't pay for indexing. TaskStore-backed pets never build
+    # one: their queries scan the store's compact columns instead.
+    _index: _TaskIndex | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __getstate__(self) -> dict:
+        """Copy/pickle without the index; the copy rebuilds its own on first query."""
+        return {**self.__dict__, "_index": None}
 
     def add_task(self, task: Task) -> None:
         """Attach a care task to this pet."""
         self.tasks.append(task)
+        self._track(self.tasks[-1])  # a TaskStore hands back a view, not `task`
 
     def remove_task(self, task_id: int) -> None:
         """Remove a task from this pet by its index in the task list."""
         if 0 <= task_id < len(self.tasks):
+            self._untrack(self.tasks[task_id])
             del self.tasks[task_id]
         else:
             raise IndexError(f"No task at index {task_id}")
@@ -101,6 +918,18 @@ class Pet:
         """Return this pet's tasks."""
         return self.tasks
 
+    def tasks_by_priority(self) -> list[Task]:
+        """Return this pet's tasks in Scheduler.sort_by_priority order, without sorting.
+
+        The task index keeps the tasks bucketed by priority rank and ordered
+        by duration within each bucket, updated as tasks are added, removed or
+        edited, so this is a straight read in order. A TaskStore sorts its
+        rank/duration columns instead.
+        """
+        if isinstance(self.tasks, TaskStore):
+            return self.tasks.by_priority()
+        return self._indexed().by_priority()
+
     def complete_task(self, task_id: int) -> Task | None:
         """Mark a task complete and auto-add its next occurrence if it recurs.
 
@@ -108,11 +937,170 @@ class Pet:
         """
         if not 0 <= task_id < len(self.tasks):
             raise IndexError(f"No task at index {task_id}")
-        follow_up = self.tasks[task_id].mark_complete()
+        return self._complete(self.tasks[task_id])
+
+    def get_task(self, task_id: int) -> Task:
+        """Return the task with this Task.id in O(1) (KeyError if this pet has none)."""
+        if isinstance(self.tasks, TaskStore):
+            return self.tasks.get_task(task_id)
+        task = self._indexed().by_id.get(task_id)
+        if task is None:
+            raise KeyError(f"No task with id {task_id}")
+        return task
+
+    def remove_task_by_id(self, task_id: int) -> Task:
+        """Remove and return the task with this Task.id.
+
+        Unlike a list index, the id still names the same task after other
+        tasks are added or removed. The lookup is O(1); finding the task's
+        slot in the list is a C-speed identity scan (or, for a TaskStore, a
+        scan of its row order for the row its id map names).
+        """
+        task = self.get_task(task_id)
+        if isinstance(self.tasks, TaskStore):
+            position = self.tasks.index_of_id(task_id)
+        else:
+            # list.index would match the first *equal* task; look for this one.
+            matches = map(operator.is_, self.tasks, itertools.repeat(task))
+            position = next(itertools.compress(itertools.count(), matches))
+        self._untrack(task)
+        del self.tasks[position]
+        return task
+
+    def complete_task_by_id(self, task_id: int) -> Task | None:
+        """Like complete_task, but addressed by Task.id (O(1) lookup)."""
+        return self._complete(self.get_task(task_id))
+
+    def _complete(self, task: Task) -> Task | None:
+        """Mark `task` complete and add its follow-up occurrence, if any."""
+        follow_up = task.mark_complete()
+        self.reindex(task)
         if follow_up is not None:
-            self.tasks.append(follow_up)
+            self.add_task(follow_up)
         return follow_up
 
+    def reindex(self, task: Task) -> None:
+        """Re-file a task after editing its fields directly.
+
+        The pet's own methods (add_task, complete_task, ...) keep its indexes
+        current; call this after changing a task's status, category, due
+        date, recurrence, priority, duration or id by assignment, so
+        find_tasks, get_task and tasks_by_priority see the new values.
+        """
+        if self._index is not None and not isinstance(self.tasks, TaskStore):
+            self._index.refile(task)
+
+    def find_tasks(
+        self,
+        *,
+        completed: bool | None = None,
+        category: str | None = None,
+        due_date: date | None = None,
+    ) -> list[Task]:
+        """Return this pet's tasks matching every given filter, in list order, via the indexes.
+
+        Starts from the smallest matching index bucket, so the cost follows the
+        size of the result rather than the size of the task list. A TaskStore
+        answers from its columns instead (see TaskStore.find).
+        """
+        if isinstance(self.tasks, TaskStore):
+            return self.tasks.find(completed=completed, category=category, due_date=due_date)
+        candidates = []
+        if completed is not None:
+            statuses = self._indexed().buckets["status"]
+            if completed:
+                candidates.append([self._indexed().lookup("status", "complete")])
+            else:
+                candidates.append([b for s, b in statuses.items() if s != "complete"])
+        if category is not None:
+            candidates.append([self._indexed().lookup("category", category)])
+        if due_date is not None:
+            candidates.append([self._indexed().lookup("due_date", due_date)])
+        if not candidates:
+            return list(self.tasks)
+
+        smallest = min(candidates, key=lambda buckets: sum(map(len, buckets)))
+        results = [task for bucket in smallest for task in bucket.values()]
+        if len(candidates) > 1:
+            results = [
+                task
+                for task in results
+                if (completed is None or task.is_complete() == completed)
+                and (category is None or task.category == category)
+                and (due_date is None or task.due_date == due_date)
+            ]
+        # Buckets hold tasks in the order they were (re)filed; restore list order.
+        return self._index.in_list_order(results)
+
+    def tasks_due_on(self, day: date) -> list[Task]:
+        """Return this pet's pending tasks due on `day`, expanding recurrences lazily.
+
+        One-off tasks (including any with a recurrence not in RECURRENCE_DELTAS,
+        as Task.is_due_on treats them) come from the due-date index; recurring
+        tasks are checked with Task.is_due_on, so no future occurrences are
+        materialized.
+        """
+        if isinstance(self.tasks, TaskStore):
+            pending = self.tasks.find(completed=False)
+            due = [t for t in pending if t.recurrence not in RECURRENCE_DELTAS and t.due_date == day]
+            due.extend(t for t in pending if t.recurrence in RECURRENCE_DELTAS and t.is_due_on(day))
+            return due
+        index = self._indexed()
+        due = [
+            task
+            for task in index.lookup("due_date", day).values()
+            if task.recurrence not in RECURRENCE_DELTAS and not task.is_complete()
+        ]
+        for recurrence, bucket in index.buckets["recurrence"].items():
+            if recurrence in RECURRENCE_DELTAS:
+                due.extend(t for t in bucket.values() if not t.is_complete() and t.is_due_on(day))
+        return due
+
+    def _has_task(self, task_id: int) -> bool:
+        """Whether this pet has a task with this Task.id (an O(1) probe)."""
+        if isinstance(self.tasks, TaskStore):
+            return task_id in self.tasks._id_rows()
+        return task_id in self._indexed().by_id
+
+    def _indexed(self) -> _TaskIndex:
+        """Return the task index, building it on first use.
+
+        The index is filled before it is published, under a lock, so a
+        concurrent caller either waits for it or sees it complete.
+        """
+        index = self._index
+        if index is None:
+            with _INDEX_LOCK:
+                index = self._index
+                if index is None:
+                    index = _TaskIndex()
+                    for task in self.tasks:
+                        self._file(index, task)
+                    self._index = index
+        return index
+
+    def _file(self, index: _TaskIndex, task: Task) -> None:
+        """Add a task to the index; occurrences are also watched for series revisions."""
+        index.add(task)
+        if isinstance(task, Occurrence):
+            task._observers += (self._on_task_changed,)
+
+    def _track(self, task: Task) -> None:
+        """Index a newly added task (once there is an index)."""
+        if self._index is not None:
+            self._file(self._index, task)
+
+    def _untrack(self, task: Task) -> None:
+        """Stop indexing (and watching) a task."""
+        if self._index is not None:
+            self._index.remove(task)
+            if isinstance(task, Occurrence):
+                task._observers = tuple(o for o in task._observers if o != self._on_task_changed)
+
+    def _on_task_changed(self, task: Task, name: str, old) -> None:
+        """Occurrence observer hook: re-file an occurrence whose fields changed."""
+        self._index.refile(task)
+
 
 @dataclass
 class Owner:
@@ -121,6 +1109,10 @@ class Owner:
     name: str
     preferences: dict = field(default_factory=dict)
     pets: list[Pet] = field(default_factory=list)
+    # Task.id -> pet, filled as pet_for_task finds tasks and kept current by
+    # the owner's own removes/completions; entries are re-checked on use
+    # because pets can also gain and lose tasks directly.
+    _pets_by_task: dict[int, Pet] = field(default_factory=dict, init=False, repr=False, compare=False)
 
     def add_preference(self, key: str, value) -> None:
         """Store a planning constraint/preference."""
@@ -134,34 +1126,180 @@ class Owner:
         """Register a pet under this owner."""
         self.pets.append(pet)
 
+    def pets_named(self, pet_name: str | None) -> list[Pet]:
+        """Return the pets called `pet_name` (case-insensitive), or every pet if None.
+
+        A scan of `pets` (an owner has only a few), so pets appended to the
+        list directly or renamed are matched by their current names.
+        """
+        if pet_name is None:
+            return self.pets
+        wanted = pet_name.casefold()
+        return [pet for pet in self.pets if pet.name.casefold() == wanted]
+
+    def pet_for_task(self, task_id: int) -> Pet:
+        """Return the pet that has the task with this Task.id (KeyError if none).
+
+        Answered in O(1) from the owner's id -> pet map; an id it hasn't seen
+        (or whose task has since moved) costs one registry probe per pet,
+        and the answer is remembered.
+        """
+        pet = self._pets_by_task.get(task_id)
+        if pet is not None and pet._has_task(task_id):
+            return pet
+        for pet in self.pets:
+            if pet._has_task(task_id):
+                self._pets_by_task[task_id] = pet
+                return pet
+        self._pets_by_task.pop(task_id, None)
+        raise KeyError(f"No task with id {task_id}")
+
+    def get_task(self, task_id: int) -> Task:
+        """Return the task with this Task.id from whichever pet has it."""
+        return self.pet_for_task(task_id).get_task(task_id)
+
+    def remove_task(self, task_id: int) -> Task:
+        """Remove and return the task with this Task.id (see Pet.remove_task_by_id)."""
+        task = self.pet_for_task(task_id).remove_task_by_id(task_id)
+        del self._pets_by_task[task_id]
+        return task
+
+    def complete_task(self, task_id: int) -> Task | None:
+        """Complete the task with this Task.id; its follow-up joins the same pet."""
+        pet = self.pet_for_task(task_id)
+        follow_up = pet.complete_task_by_id(task_id)
+        if follow_up is not None:
+            self._pets_by_task[follow_up.id] = pet
+        return follow_up
+
     def find_tasks(
-        self, *, completed: bool | None = None, pet_name: str | None = None
+        self,
+        *,
+        completed: bool | None = None,
+        pet_name: str | None = None,
+        category: str | None = None,
+        due_date: date | None = None,
     ) -> list[Task]:
-        """Return tasks across all pets, optionally filtered by status and/or pet.
+        """Return tasks across all pets, optionally filtered by status, pet, category or due date.
 
-        Pass `completed=True`/`False` to filter by completion status, and/or
-        `pet_name` to limit to one pet (case-insensitive). Omit a filter to
-        ignore it; omitting both returns every task.
+        Pass `completed=True`/`False` to filter by completion status, `pet_name`
+        to limit to one pet (case-insensitive), and/or `category`/`due_date`
+        for exact matches. Omit a filter to ignore it; omitting all returns
+        every task. Each filter is answered from an index (see Pet.find_tasks),
+        so the cost follows the number of matches, not the number of tasks.
         """
         results = []
-        for pet in self.pets:
-            if pet_name is not None and pet.name.lower() != pet_name.lower():
-                continue
-            for task in pet.tasks:
-                if completed is not None and task.is_complete() != completed:
-                    continue
-                results.append(task)
+        for pet in self.pets_named(pet_name):
+            results.extend(pet.find_tasks(completed=completed, category=category, due_date=due_date))
         return results
 
+    def tasks_due_on(self, day: date, *, pet_name: str | None = None) -> list[Task]:
+        """Return pending tasks due on `day` across all pets (or one pet, by name).
 
-@dataclass
+        Recurring tasks count on every day their series lands on, even if
+        earlier occurrences were never completed (see Pet.tasks_due_on).
+        """
+        return [task for pet in self.pets_named(pet_name) for task in pet.tasks_due_on(day)]
+
+    def iter_due(self, start: date, end: date) -> Iterator[tuple[date, Pet, Task]]:
+        """Lazily yield (date, pet, task) for every pending occurrence in start..end, by date.
+
+        Each pending task contributes a Task.occurrences generator and the
+        streams are merged with a heap, so only one upcoming date per task is
+        held in memory at a time, however long the window.
+        """
+        def stream(order: tuple[int, int], pet: Pet, task: Task):
+            for day in task.occurrences(start, end):
+                yield day, order, pet, task
+
+        streams = [
+            stream((p, t), pet, task)
+            for p, pet in enumerate(self.pets)
+            for t, task in enumerate(pet.tasks)
+            if not task.is_complete()
+        ]
+        # (pet, task) position breaks date ties, so pets/tasks are never compared.
+        for day, _, pet, task in heapq.merge(*streams):
+            yield day, pet, task
+
+
+@dataclass(init=False)
 class ScheduledTask:
-    """A task placed at a concrete time slot in a plan."""
+    """A task placed at a concrete time slot in a plan.
+
+    The slot is stored as whole minutes since midnight (`start_minute`,
+    `end_minute`) so the scheduler works in plain integer arithmetic.
+    `start_time`/`end_time` are derived `datetime.time` values, produced only
+    when read (e.g. for display). Either form can be passed in.
+    """
 
     task: Task
-    start_time: time
-    end_time: time
+    start_minute: int
+    end_minute: int
     pet_name: str = ""  # which pet this slot belongs to (for conflict messages)
+    # (key, (row, explain line)) from the last Plan.row/explain_line call.
+    _rendered: tuple | None = field(default=None, repr=False, compare=False)
+
+    def __init__(
+        self,
+        task: Task,
+        start_time: time | None = None,
+        end_time: time | None = None,
+        pet_name: str = "",
+        *,
+        start_minute: int | None = None,
+        end_minute: int | None = None,
+    ) -> None:
+        """Create a slot from `time`s (start_time/end_time) or minutes (start_minute/end_minute)."""
+        self.task = task
+        self.start_minute = _to_minutes(start_time) if start_minute is None else start_minute
+        self.end_minute = _to_minutes(end_time) if end_minute is None else end_minute
+        self.pet_name = pet_name
+        self._rendered = None
+
+    @property
+    def start_time(self) -> time:
+        """Start of the slot as a time of day (wraps past midnight)."""
+        return _TIMES_OF_DAY[self.start_minute % MINUTES_PER_DAY]
+
+    @start_time.setter
+    def start_time(self, value: time) -> None:
+        self.start_minute = _to_minutes(value)
+
+    @property
+    def end_time(self) -> time:
+        """End of the slot as a time of day (wraps past midnight)."""
+        return _TIMES_OF_DAY[self.end_minute % MINUTES_PER_DAY]
+
+    @end_time.setter
+    def end_time(self, value: time) -> None:
+        self.end_minute = _to_minutes(value)
+
+    @property
+    def task_id(self) -> int:
+        """Task.id of the scheduled task, for looking it up again after edits."""
+        return self.task.id
+
+
+def _timed(span: str):
+    """Decorate a Plan/Scheduler method to run inside `self.recorder.span(span)`.
+
+    With no recorder (the default) the method runs directly after a single
+    attribute check, so uninstrumented code pays next to nothing.
+    """
+
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            recorder = self.recorder
+            if recorder is None:
+                return method(self, *args, **kwargs)
+            with recorder.span(span):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
 
 
 @dataclass
@@ -171,84 +1309,687 @@ class Plan:
     entries: list[ScheduledTask] = field(default_factory=list)
     total_minutes: int = 0
     skipped: list[Task] = field(default_factory=list)
+    # Optional pawpal_metrics.Recorder, inherited from the Scheduler that built it.
+    recorder: object = field(default=None, repr=False, compare=False)
 
     def add_entry(self, scheduled_task: ScheduledTask) -> None:
         """Append a scheduled task and accumulate total time."""
         self.entries.append(scheduled_task)
         self.total_minutes += scheduled_task.task.duration_minutes
 
-    def explain(self) -> str:
-        """Explain why each task was chosen and ordered."""
-        lines = []
+    def entry_for(self, task_id: int) -> ScheduledTask | None:
+        """Return the slot scheduled for the task with this Task.id (None if it wasn't placed)."""
+        return next((e for e in self.entries if e.task.id == task_id), None)
+
+    def diff(self, previous: Plan) -> PlanDiff:
+        """Return what changed from `previous` to this plan, matching slots by Task.id.
+
+        A slot is added or removed when its task is only in one plan, retimed
+        when its start/end minutes changed, and moved when its times are the
+        same but it is outside the longest run of surviving slots still in
+        their old relative order (so inserting one slot, or moving one slot
+        to the front, marks only that slot as moved). One pass over each
+        plan plus an O(n log n) order check. Slots are compared as they are
+        now, so keep an untouched copy of `previous` if something (e.g.
+        resolve_conflicts) edits its slots in place.
+        """
+        old = {entry.task.id: (position, entry) for position, entry in enumerate(previous.entries)}
+        changes = PlanDiff()
+        kept = []  # (old position, entry) for slots in both plans, in new order
         for entry in self.entries:
-            t = entry.task
-            lines.append(
-                f"{entry.start_time:%H:%M} — {t.title} ({t.duration_minutes} min) "
-                f"[priority: {t.priority}]"
-            )
-        if self.skipped:
-            skipped_titles = ", ".join(t.title for t in self.skipped)
-            lines.append(
-                f"Skipped (not enough time): {skipped_titles}"
-            )
+            match = old.pop(entry.task.id, None)
+            if match is None:
+                changes.added.append(entry)
+            elif (match[1].start_minute, match[1].end_minute) != (entry.start_minute, entry.end_minute):
+                changes.retimed.append(entry)
+            else:
+                kept.append((match[0], entry))
+        changes.removed = [entry for _, entry in old.values()]
+        in_order = _longest_in_order([position for position, _ in kept])
+        changes.moved = [entry for i, (_, entry) in enumerate(kept) if i not in in_order]
+        changes.skipped_changed = [t.id for t in self.skipped] != [t.id for t in previous.skipped]
+        return changes
+
+    def explain_line(self, entry: ScheduledTask) -> str:
+        """The explain line for one slot (memoized, see row)."""
+        return _render(entry)[1]
+
+    @_timed("explain")
+    def explain(self, lines: Iterable[str] | None = None) -> str:
+        """Explain why each task was chosen and ordered.
+
+        Pass `lines` (one explain_line per entry, e.g. kept from an earlier
+        render) to skip formatting the entries again.
+        """
+        return "\n".join(self.iter_explain(lines))
+
+    def iter_explain(self, lines: Iterable[str] | None = None) -> Iterator[str]:
+        """Yield the explain text one line at a time, for streaming big plans out."""
         if not self.entries:
-            return "No tasks could be scheduled within the available time."
-        header = (
+            yield "No tasks could be scheduled within the available time."
+            return
+        yield (
             f"Scheduled {len(self.entries)} task(s) using {self.total_minutes} min, "
             "ordered by priority then placed in order:"
         )
-        return header + "\n" + "\n".join(lines)
+        if lines is None:
+            lines = map(self.explain_line, self.entries)
+        yield from lines
+        if self.skipped:
+            skipped_titles = ", ".join(t.title for t in self.skipped)
+            yield f"Skipped (not enough time): {skipped_titles}"
 
+    @_timed("to_table")
     def to_table(self) -> list[dict]:
         """Return rows suitable for display (e.g. st.table)."""
-        return [
-            {
-                "start": f"{e.start_time:%H:%M}",
-                "end": f"{e.end_time:%H:%M}",
-                "task": e.task.title,
-                "duration_minutes": e.task.duration_minutes,
-                "priority": e.task.priority,
+        return list(self.iter_rows())
+
+    def iter_rows(self) -> Iterator[dict]:
+        """Yield the to_table rows one at a time, for streaming big plans out."""
+        return map(self.row, self.entries)
+
+    def row(self, entry: ScheduledTask) -> dict:
+        """The to_table row for one slot.
+
+        Rows and explain lines are formatted once per slot and kept on the
+        slot until its times or its task's title, duration or priority
+        change, so repeated to_table/explain calls reuse them. Each call
+        gets its own copy of the row, so callers may edit it freely.
+        """
+        return dict(_render(entry)[0])
+
+
+def _render(entry: ScheduledTask) -> tuple[dict, str]:
+    """Return (row, explain line) for a slot, reusing the last result while nothing it shows changed."""
+    t = entry.task
+    key = (entry.start_minute, entry.end_minute, t.title, t.duration_minutes, t.priority)
+    cached = entry._rendered
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    start = _CLOCK_LABELS[entry.start_minute % MINUTES_PER_DAY]
+    row = {
+        "start": start,
+        "end": _CLOCK_LABELS[entry.end_minute % MINUTES_PER_DAY],
+        "task": t.title,
+        "duration_minutes": t.duration_minutes,
+        "priority": t.priority,
+    }
+    rendered = (row, f"{start} — {t.title} ({t.duration_minutes} min) [priority: {t.priority}]")
+    entry._rendered = (key, rendered)
+    return rendered
+
+
+def _longest_in_order(positions: list[int]) -> set[int]:
+    """Indexes of a longest increasing run of distinct `positions` (patience sorting).
+
+    Scans from the end, so of two slots that swapped places the one that now
+    comes later is left out (reported as moved).
+    """
+    keys: list[int] = []  # keys[k]: largest -position ending a run of length k + 1
+    ends: list[int] = []  # ends[k]: the index holding keys[k]
+    before: list[int | None] = [None] * len(positions)
+    for i in reversed(range(len(positions))):
+        key = -positions[i]
+        k = bisect.bisect_left(keys, key)
+        before[i] = ends[k - 1] if k else None
+        if k == len(keys):
+            keys.append(key)
+            ends.append(i)
+        else:
+            keys[k] = key
+            ends[k] = i
+    run = set()
+    i = ends[-1] if ends else None
+    while i is not None:
+        run.add(i)
+        i = before[i]
+    return run
+
+
+@dataclass
+class PlanDiff:
+    """The slots that changed between two plans (see Plan.diff)."""
+
+    added: list[ScheduledTask] = field(default_factory=list)
+    removed: list[ScheduledTask] = field(default_factory=list)
+    moved: list[ScheduledTask] = field(default_factory=list)  # same times, new order
+    retimed: list[ScheduledTask] = field(default_factory=list)  # new start/end
+    skipped_changed: bool = False
+
+    def __bool__(self) -> bool:
+        """True if anything changed."""
+        return bool(self.added or self.removed or self.moved or self.retimed or self.skipped_changed)
+
+
+@dataclass
+class BudgetSweep:
+    """Which tasks a plan would place at each of many budgets (Scheduler.sweep_budgets).
+
+    `placed[j, i]` is True when `tasks[i]` is placed with `budgets[j]`
+    minutes; `tasks` are in the order build_plan considers them. Everything
+    is held in NumPy arrays, so one sweep over a day's worth of budgets is a
+    single boolean matrix rather than hundreds of Plans.
+    """
+
+    tasks: list[Task]
+    budgets: object  # int64 array, shape (budgets,)
+    placed: object  # bool array, shape (budgets, tasks)
+    total_minutes: object  # int64 array, shape (budgets,)
+
+    def _row(self, budget: int) -> int:
+        """Index of `budget` in the sweep."""
+        matches = (self.budgets == budget).nonzero()[0]
+        if not len(matches):
+            raise KeyError(f"Budget {budget} was not part of the sweep")
+        return int(matches[0])
+
+    def placed_tasks(self, budget: int) -> list[Task]:
+        """Tasks placed with `budget` minutes, in planning order."""
+        row = self.placed[self._row(budget)]
+        return [task for task, keep in zip(self.tasks, row.tolist()) if keep]
+
+    def skipped_tasks(self, budget: int) -> list[Task]:
+        """Tasks skipped with `budget` minutes, in planning order."""
+        row = self.placed[self._row(budget)]
+        return [task for task, keep in zip(self.tasks, row.tolist()) if not keep]
+
+    def iter_rows(self) -> Iterator[dict]:
+        """Yield one summary row per budget (minutes used, tasks placed/skipped)."""
+        counts = self.placed.sum(axis=1).tolist()
+        for budget, total, placed in zip(self.budgets.tolist(), self.total_minutes.tolist(), counts):
+            yield {
+                "available_minutes": budget,
+                "total_minutes": total,
+                "placed": placed,
+                "skipped": len(self.tasks) - placed,
             }
-            for e in self.entries
-        ]
 
 
 class Scheduler:
     """Turns tasks + constraints into an ordered Plan."""
 
-    def __init__(self, available_minutes: int, start_time: time = time(8, 0)) -> None:
-        """Set the daily time budget and the time of day planning starts."""
+    def __init__(
+        self,
+        available_minutes: int,
+        start_time: time = time(8, 0),
+        strategy: str = "greedy",
+        recorder=None,
+        cache: PlanCache | None = None,
+        blocked: Iterable[tuple[time, time]] = (),
+    ) -> None:
+        """Set the daily time budget, the time of day planning starts, and the strategy.
+
+        `strategy` picks how build_plan chooses tasks: "greedy" (default) or
+        "optimal" (see build_optimal_plan). Pass a pawpal_metrics.Recorder as
+        `recorder` to collect timing spans and counters for planning, conflict
+        checks and the plans' explain/to_table. Pass a PlanCache as `cache` to
+        reuse plans for task lists the scheduler has already seen. `blocked`
+        lists (start, end) times when nothing can be scheduled (e.g. the
+        owner is at work).
+        """
+        if strategy not in PLAN_STRATEGIES:
+            raise ValueError(f"Unknown planning strategy {strategy!r}")
         self.available_minutes = available_minutes
         self.start_time = start_time
+        self.strategy = strategy
+        self.recorder = recorder
+        self.cache = cache
+        self.blocked = tuple((start, end) for start, end in blocked)
+        for start, end in self.blocked:
+            if start >= end:
+                raise ValueError(f"Blocked interval must end after it starts: {start:%H:%M}-{end:%H:%M}")
+
+    @classmethod
+    def for_owner(cls, owner: Owner, **options) -> Scheduler:
+        """Build a scheduler from an owner's preferences.
 
+        Reads "available_minutes" (required), "day_start" (default 08:00) and
+        "blocked" (default none); other keyword arguments are passed through.
+        """
+        budget = owner.get_preference("available_minutes")
+        if budget is None:
+            raise ValueError(f"Owner {owner.name!r} has no available_minutes preference")
+        return cls(
+            available_minutes=budget,
+            start_time=owner.get_preference("day_start") or time(8, 0),
+            blocked=owner.get_preference("blocked") or (),
+            **options,
+        )
+
+    def __getstate__(self) -> dict:
+        """Pickle without the recorder or cache (they stay in this process)."""
+        return {**self.__dict__, "recorder": None, "cache": None}
+
+    @_timed("build_plan")
     def build_plan(self, tasks: list[Task], pet_name: str = "") -> Plan:
         """Sort by priority, then greedily place tasks that fit the time budget.
 
         Pass `pet_name` to tag each slot with its owner so conflict warnings can
-        say which pet a task belongs to.
+        say which pet a task belongs to. With strategy="optimal" this delegates
+        to build_optimal_plan instead. With a `cache`, an equivalent task list
+        seen before is answered from the cache.
+        """
+        if self.cache is not None:
+            plan = self.cache.get_plan(self, tasks, pet_name)
+        else:
+            plan = self._build_uncached(tasks, pet_name)
+        self._count_plan(len(tasks), plan)
+        return plan
+
+    @_timed("build_plan")
+    def plan_pet(self, pet: Pet) -> Plan:
+        """build_plan for one pet's tasks, taking them from its priority queue instead of sorting.
+
+        Pet.tasks_by_priority already has the tasks in sort_by_priority
+        order, so there is no sort and no per-task key call. A pet that has
+        no index yet is planned by sorting (see _priority_order), and with a
+        `cache` this is just build_plan (the cache keys on the task list).
+        """
+        if self.cache is not None:
+            plan = self.cache.get_plan(self, pet.list_tasks(), pet.name)
+        else:
+            plan = self._build_uncached(pet.list_tasks(), pet.name, ordered=self._priority_order(pet))
+        self._count_plan(len(pet.tasks), plan)
+        return plan
+
+    def _priority_order(self, pet: Pet) -> list[Task]:
+        """A pet's tasks in sort_by_priority order: read off its index if it has one, else sorted.
+
+        Building the index costs more than one sort, so planning a pet that
+        nothing has queried yet doesn't build it.
+        """
+        if pet._index is None:
+            return self.sort_by_priority(pet.list_tasks())
+        return pet.tasks_by_priority()
+
+    def _count_plan(self, considered: int, plan: Plan) -> None:
+        """Record how many tasks a plan considered, placed and skipped."""
+        if self.recorder is not None:
+            self.recorder.count("tasks_considered", considered)
+            self.recorder.count("tasks_placed", len(plan.entries))
+            self.recorder.count("tasks_skipped", len(plan.skipped))
+
+    def _build_uncached(self, tasks: list[Task], pet_name: str, *, ordered: list[Task] | None = None) -> Plan:
+        """Build a plan with the configured strategy, bypassing the cache.
+
+        Pass `ordered` when the tasks are already in priority order to skip
+        the sort.
+        """
+        if ordered is None:
+            ordered = self.sort_by_priority(tasks)
+        keep = self._knapsack(ordered) if self.strategy == "optimal" else None
+        return self._place_in_order(ordered, pet_name, keep=keep)
+
+    def build_optimal_plan(self, tasks: list[Task], pet_name: str = "") -> Plan:
+        """Pick the task set worth the most priority-weighted minutes, then place it.
+
+        Each task is worth `priority_rank() * duration_minutes`, so the plan
+        uses as much of the budget as possible while favoring important work.
+        The choice is a 0/1 knapsack solved by dynamic programming over every
+        budget from 0 to `available_minutes` (or the tasks' total minutes, if
+        smaller), one vectorized NumPy step per task. Among equally valuable
+        sets, tasks earlier in priority order win.
+        Chosen tasks are laid out back-to-back in priority order; the rest go
+        to `plan.skipped`, just like build_plan.
+        """
+        ordered = self.sort_by_priority(tasks)
+        return self._place_in_order(ordered, pet_name, keep=self._knapsack(ordered))
+
+    def _knapsack(self, ordered: list[Task]) -> list[bool]:
+        """Flag the tasks (in priority order) that build_optimal_plan should place."""
+        capacity = self._knapsack_capacity(ordered, self.available_minutes)
+        taken = self._knapsack_table(ordered, capacity)
+        chosen = set()
+        for i in range(len(ordered) - 1, -1, -1):
+            if ordered[i].duration_minutes <= 0:
+                chosen.add(i)  # free to place
+            elif taken[i, capacity]:
+                chosen.add(i)
+                capacity -= ordered[i].duration_minutes
+        return [i in chosen for i in range(len(ordered))]
+
+    @staticmethod
+    def _knapsack_capacity(ordered: list[Task], budget: int) -> int:
+        """Size the knapsack table: the budget, but no more than all the tasks need.
+
+        A budget past the tasks' total can't change the choice, so a huge
+        available_minutes doesn't allocate a huge table.
+        """
+        needed = sum(task.duration_minutes for task in ordered if task.duration_minutes > 0)
+        return max(min(budget, needed), 0)
+
+    @staticmethod
+    def _knapsack_table(ordered: list[Task], budget: int):
+        """Return taken[i, c]: whether the best set within c minutes uses task i (given tasks 0..i)."""
+        import numpy as np  # only the knapsack and budget sweeps need NumPy; keep imports light
+
+        # best[c] = highest value reachable using at most c minutes so far.
+        best = np.zeros(budget + 1, dtype=np.int64)
+        taken = np.zeros((len(ordered), budget + 1), dtype=bool)
+        for i, task in enumerate(ordered):
+            d = task.duration_minutes
+            if d <= 0 or d > budget:
+                continue
+            candidate = best[:-d] + task.priority_rank() * d
+            better = candidate > best[d:]
+            taken[i, d:] = better
+            best[d:] = np.where(better, candidate, best[d:])
+        return taken
+
+    @_timed("sweep_budgets")
+    def sweep_budgets(self, tasks: list[Task], budgets: Iterable[int]) -> BudgetSweep:
+        """Work out what build_plan would place for every budget in `budgets` at once.
+
+        Answers "what gets done with 30, 60, ... 1440 minutes?" without
+        building a Plan per budget: the tasks are sorted once, then each task
+        is decided for all budgets together with vectorized NumPy comparisons.
+        Greedy plans start from prefix sums of the durations, since a budget
+        places every leading task whose running total fits; the remaining
+        tasks are a NumPy step each. With strategy="optimal" one knapsack
+        table for the largest budget answers every smaller one too. Uses
+        this scheduler's strategy, start time and blocked time; only
+        `available_minutes` is swept. When windows or blocked time apply,
+        placement depends on the gaps left at each budget, so those sweeps
+        plan each budget in turn (still sorting once).
+        """
+        import numpy as np
+
+        ordered = self.sort_by_priority(tasks)
+        budgets = np.array(list(budgets), dtype=np.int64)
+        durations = np.array([t.duration_minutes for t in ordered], dtype=np.int64)
+        placed = np.zeros((len(budgets), len(ordered)), dtype=bool)
+
+        if self._needs_bitmap(ordered):
+            for j, budget in enumerate(budgets.tolist()):
+                scheduler = Scheduler(budget, self.start_time, self.strategy, blocked=self.blocked)
+                keep = scheduler._knapsack(ordered) if self.strategy == "optimal" else None
+                timeline = _Timeline(scheduler, ordered)
+                for i, task in enumerate(ordered):
+                    if keep is None or keep[i]:
+                        placed[j, i] = timeline.place(task, check_budget=keep is None) is not None
+        elif self.strategy == "optimal":
+            largest = self._knapsack_capacity(ordered, int(budgets.max(initial=0)))
+            taken = self._knapsack_table(ordered, largest)
+            capacity = np.clip(budgets, 0, largest)
+            for i in range(len(ordered) - 1, -1, -1):
+                d = int(durations[i])
+                placed[:, i] = True if d <= 0 else taken[i, capacity]
+                capacity -= durations[i] * placed[:, i]
+        else:
+            # Every budget places the leading tasks whose running total fits the
+            # smallest budget; only the tasks after that need deciding per budget.
+            first = 0
+            if len(ordered) and len(budgets) and durations.min() >= 0:
+                first = int(np.searchsorted(np.cumsum(durations), budgets.min(), side="right"))
+            placed[:, :first] = True
+            remaining = budgets - durations[:first].sum()
+            for i in range(first, len(ordered)):
+                fits = durations[i] <= remaining
+                placed[:, i] = fits
+                remaining -= durations[i] * fits
+
+        return BudgetSweep(
+            tasks=ordered,
+            budgets=budgets,
+            placed=placed,
+            total_minutes=placed @ durations,
+        )
+
+    def _place_in_order(
+        self, ordered: list[Task], pet_name: str, keep: list[bool] | None = None
+    ) -> Plan:
+        """Lay tasks out from start_time in the given order.
+
+        Without `keep`, a task is placed whenever it fits the remaining budget
+        (the greedy rule). With `keep`, exactly the flagged tasks are placed.
+        Tasks go back-to-back, unless some task has a time window or the
+        scheduler has blocked time: then each task takes the earliest free gap
+        that fits its window (see _first_slot), and a task with no such gap is
+        skipped. Entries stay in placement order; use sort_by_time for a
+        chronological view. Anything not placed is recorded in `plan.skipped`.
         """
-        plan = Plan()
-        remaining = self.available_minutes
-        cursor = self._to_datetime(self.start_time)
+        plan = Plan(recorder=self.recorder)
+        timeline = _Timeline(self, ordered)
 
-        for task in self.sort_by_priority(tasks):
-            if self.fits(task, remaining):
-                end = cursor + timedelta(minutes=task.duration_minutes)
+        for i, task in enumerate(ordered):
+            if keep is None:
+                start = timeline.place(task)
+            else:
+                start = timeline.place(task, check_budget=False) if keep[i] else None
+            if start is not None:
                 plan.add_entry(
                     ScheduledTask(
                         task=task,
-                        start_time=cursor.time(),
-                        end_time=end.time(),
+                        start_minute=start,
+                        end_minute=start + task.duration_minutes,
                         pet_name=pet_name,
                     )
                 )
-                cursor = end
-                remaining -= task.duration_minutes
             else:
                 plan.skipped.append(task)
 
         return plan
 
+    @_timed("build_shared_plan")
+    def build_shared_plan(self, owner: Owner, weights: dict[str, float] | None = None) -> Plan:
+        """Plan all of an owner's pets onto one timeline with one shared budget.
+
+        Each pet's tasks are put in priority order (like plan_pet, read off
+        its index if it has one, else sorted), and a heap holds every pet's
+        next task keyed by (priority, the pet's minutes so far / its weight,
+        duration). Popping it always takes the most important waiting task;
+        among equally important ones, the pet that has had the least weighted
+        time goes first, so a pet weighted 2 in `weights` (by pet name,
+        default 1) gets about twice the minutes of a weight-1 pet when they
+        compete. Slots come from one timeline shared by every pet (placed like
+        build_plan), so the combined plan has no conflicts. With
+        strategy="optimal" the knapsack picks which tasks to place across all
+        pets and the heap decides their order. O(n log n) for n tasks.
+        """
+        weights = weights or {}
+        queues = []
+        for pet in owner.pets:
+            weight = weights.get(pet.name, 1)
+            if weight <= 0:
+                raise ValueError(f"Weight for {pet.name!r} must be positive, got {weight}")
+            queues.append((pet.name, weight, self._priority_order(pet)))
+        tasks = [task for _, _, pet_tasks in queues for task in pet_tasks]
+
+        keep = None
+        if self.strategy == "optimal":
+            ordered = self.sort_by_priority(tasks)
+            keep = {id(task) for task, chosen in zip(ordered, self._knapsack(ordered)) if chosen}
+
+        plan = Plan(recorder=self.recorder)
+        timeline = _Timeline(self, tasks)
+        used = [0] * len(queues)
+        # (-rank, weighted minutes used, duration, pet position, task position)
+        heap = [
+            (-pet_tasks[0].priority_rank(), 0.0, pet_tasks[0].duration_minutes, p, 0)
+            for p, (_, _, pet_tasks) in enumerate(queues)
+            if pet_tasks
+        ]
+        heapq.heapify(heap)
+        while heap:
+            _, _, _, p, i = heapq.heappop(heap)
+            pet_name, weight, pet_tasks = queues[p]
+            task = pet_tasks[i]
+            if keep is None:
+                start = timeline.place(task)
+            else:
+                start = timeline.place(task, check_budget=False) if id(task) in keep else None
+            if start is not None:
+                plan.add_entry(
+                    ScheduledTask(
+                        task=task,
+                        start_minute=start,
+                        end_minute=start + task.duration_minutes,
+                        pet_name=pet_name,
+                    )
+                )
+                used[p] += task.duration_minutes
+            else:
+                plan.skipped.append(task)
+            if i + 1 < len(pet_tasks):
+                nxt = pet_tasks[i + 1]
+                heapq.heappush(heap, (-nxt.priority_rank(), used[p] / weight, nxt.duration_minutes, p, i + 1))
+        return plan
+
+    @_timed("build_horizon")
+    def build_horizon(self, tasks: list[Task], start: date, days: int, pet_name: str = "") -> dict[date, Plan]:
+        """Plan `days` consecutive days from `start` in one call; returns {day: Plan} in date order.
+
+        Each pending task is planned on the days it falls due: one-off tasks
+        on their due_date (undated ones on `start`), recurring tasks on every
+        occurrence in the window (the same Task object each day, no copies).
+        A task that doesn't fit is carried to the next day, gaining one
+        priority rank per day it has waited, so old work eventually beats
+        fresh work; overdue one-offs start out already escalated. A carried
+        occurrence of a recurring task is dropped once the series' next one
+        is due. Each day gets this scheduler's budget, start time and blocked
+        time, and is placed like build_plan; a day's `skipped` lists what was
+        carried (or dropped) from it.
+
+        A task's urgency on any day is (days waited + rank), so ordering by
+        (due date - rank, duration) is the same on every day. The tasks are
+        sorted once, each day's new arrivals are bucketed in that order, and
+        every day merges its bucket with the already-sorted carry-over
+        instead of sorting again.
+        """
+        if days < 0:
+            raise ValueError(f"days must be zero or more, got {days}")
+        end = start + timedelta(days=days - 1)
+        arrivals: dict[date, list[tuple]] = {}
+        carry: list[tuple] = []  # overdue one-offs, then each day's leftovers
+        for position, task in enumerate(self.sort_by_priority(tasks)):
+            if task.is_complete():
+                continue
+            # An unknown recurrence (e.g. "monthly") is planned like a one-off,
+            # as occurrences and is_due_on treat it.
+            repeats = task.recurrence in RECURRENCE_DELTAS
+            if not repeats and (task.due_date or start) < start:
+                due = task.due_date
+                carry.append((due.toordinal() - task.priority_rank(), task.duration_minutes, position, task, due))
+                continue
+            undated_one_off = task.due_date is None and not repeats
+            for day in (start,) if undated_one_off else task.occurrences(start, end):
+                arrivals.setdefault(day, []).append(
+                    (day.toordinal() - task.priority_rank(), task.duration_minutes, position, task, day)
+                )
+        carry.sort()
+        # Only whether some task has a window matters to _Timeline, so check that once.
+        probe = next(([t] for t in tasks if t.earliest is not None or t.latest is not None), [])
+
+        plans: dict[date, Plan] = {}
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            candidates = list(heapq.merge(carry, arrivals.get(day, ())))
+            keep = self._knapsack([item[3] for item in candidates]) if self.strategy == "optimal" else None
+            plan = Plan(recorder=self.recorder)
+            timeline = _Timeline(self, probe)
+            carry = []
+            for i, item in enumerate(candidates):
+                task = item[3]
+                if keep is None:
+                    slot = timeline.place(task)
+                else:
+                    slot = timeline.place(task, check_budget=False) if keep[i] else None
+                if slot is not None:
+                    plan.add_entry(
+                        ScheduledTask(task, start_minute=slot, end_minute=slot + task.duration_minutes, pet_name=pet_name)
+                    )
+                    continue
+                plan.skipped.append(task)
+                delta = RECURRENCE_DELTAS.get(task.recurrence)
+                if delta is None or day + timedelta(days=1) < item[4] + delta:
+                    carry.append(item)
+            plans[day] = plan
+        return plans
+
+    def _needs_bitmap(self, tasks: Iterable[Task]) -> bool:
+        """Return True if blocked time or any task window rules out back-to-back placement."""
+        return bool(self.blocked) or any(t.earliest is not None or t.latest is not None for t in tasks)
+
+    def _free_minutes(self) -> int:
+        """Availability bitmap for one plan: bit m is set if minute m is open.
+
+        Open minutes run from start_time to midnight (or further, if the
+        budget runs past it), minus the blocked intervals.
+        """
+        start = _to_minutes(self.start_time)
+        free = _minute_mask(start, max(MINUTES_PER_DAY, start + self.available_minutes))
+        for block_start, block_end in self.blocked:
+            free &= ~_minute_mask(_to_minutes(block_start), _to_minutes(block_end))
+        return free
+
+    def _first_slot(self, task: Task, free: int) -> int | None:
+        """Start minute of the earliest free gap that fits the task and its window (None if none)."""
+        lo = 0 if task.earliest is None else _to_minutes(task.earliest)
+        hi = free.bit_length() if task.latest is None else _to_minutes(task.latest)
+        return _first_fit(free, task.duration_minutes, lo, hi)
+
+    @_timed("build_plans")
+    def build_plans(
+        self,
+        pets: Iterable[Pet],
+        *,
+        max_workers: int | None = None,
+        use_processes: bool = False,
+        chunk_size: int = 64,
+    ) -> list[Plan]:
+        """Build one Plan per pet across a worker pool, returned in input order.
+
+        Pets are split into chunks of `chunk_size` and fanned out over a thread
+        pool, or a process pool with `use_processes=True` (the one that scales
+        with cores, since planning is pure Python). Process workers only receive
+        a compact (duration, priority, window) row per task and send back which task
+        indexes were placed and when, so the returned plans still point at the
+        caller's own Task objects. A single chunk is planned inline.
+        """
+        pets = list(pets)
+        chunks = [pets[i:i + chunk_size] for i in range(0, len(pets), max(chunk_size, 1))]
+        if len(chunks) <= 1 or max_workers == 1:
+            return [self.plan_pet(pet) for pet in pets]
+
+        # Imported here: concurrent.futures pulls in multiprocessing, which
+        # would otherwise dominate startup for callers that never fan out.
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        plans: list[Plan] = []
+        if use_processes:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                jobs = [
+                    [[_task_row(t) for t in pet.list_tasks()] for pet in chunk]
+                    for chunk in chunks
+                ]
+                layouts = pool.map(_layout_rows, [self] * len(jobs), jobs)
+                for chunk, chunk_layouts in zip(chunks, layouts):
+                    for pet, layout in zip(chunk, chunk_layouts):
+                        plan = _plan_from_layout(layout, pet.list_tasks(), pet.name)
+                        plan.recorder = self.recorder
+                        plans.append(plan)
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                for chunk_plans in pool.map(self._build_chunk, chunks):
+                    plans.extend(chunk_plans)
+        return plans
+
+    def build_owner_plans(self, owners: Iterable[Owner], **pool_options) -> list[list[Plan]]:
+        """Plan every pet of every owner in one batch (see build_plans).
+
+        Returns one list of plans per owner, in the same order as `owners` and
+        each owner's `pets`.
+        """
+        owners = list(owners)
+        plans = iter(
+            self.build_plans((pet for owner in owners for pet in owner.pets), **pool_options)
+        )
+        return [[next(plans) for _ in owner.pets] for owner in owners]
+
+    def _build_chunk(self, pets: list[Pet]) -> list[Plan]:
+        """Plan a chunk of pets in the current thread."""
+        return [self.plan_pet(pet) for pet in pets]
+
     def sort_by_priority(self, tasks: list[Task]) -> list[Task]:
         """Order by priority (high first), then shorter tasks first as a tiebreaker."""
         return sorted(
@@ -261,48 +2002,175 @@ class Scheduler:
 
         Useful before resolve_conflicts, which assumes start-time order.
         """
-        return sorted(scheduled, key=lambda st: st.start_time)
+        return sorted(scheduled, key=lambda st: st.start_minute)
+
+    def merge_by_time(self, timelines: Iterable[Plan | list[ScheduledTask]]) -> Iterator[ScheduledTask]:
+        """Lazily merge several plans (or entry lists) into one chronological stream.
+
+        Each pet's plan is normally already in time order, so instead of
+        pooling everything and re-sorting, this k-way merges the timelines
+        with a heap: O(n log k) for k timelines, and no pooled copy of the
+        entries. Slots come out by (start, end), the order detect_conflicts,
+        iter_conflicts and resolve_conflicts expect from a stream. A timeline
+        that isn't in order (e.g. a plan placed around time windows) is
+        sorted on its own first.
+        """
+        key = _slot_key
+        streams = []
+        for timeline in timelines:
+            entries = timeline.entries if isinstance(timeline, Plan) else timeline
+            in_order = all(key(a) <= key(b) for a, b in zip(entries, itertools.islice(entries, 1, None)))
+            streams.append(entries if in_order else sorted(entries, key=key))
+        return heapq.merge(*streams, key=key)
 
     def fits(self, task: Task, remaining_time: int) -> bool:
         """Return True if the task fits in the remaining time budget."""
         return task.duration_minutes <= remaining_time
 
-    def detect_conflicts(self, scheduled: list[ScheduledTask]) -> list[str]:
+    @_timed("detect_conflicts")
+    def detect_conflicts(self, scheduled: Iterable[ScheduledTask]) -> list[str]:
         """Return a warning string for each overlapping pair of time slots.
 
         Lightweight, non-destructive conflict detection: it never mutates the
-        schedule and never raises. It compares every pair of entries and flags
-        any whose time ranges overlap (two tasks share part of the same slot),
-        whether they belong to the same pet or different pets. Returns an empty
-        list when there are no conflicts.
-        """
-        warnings = []
-        for i in range(len(scheduled)):
-            for j in range(i + 1, len(scheduled)):
-                a, b = scheduled[i], scheduled[j]
-                # Half-open overlap test: a starts before b ends AND b starts before a ends.
-                if a.start_time < b.end_time and b.start_time < a.end_time:
-                    warnings.append(
-                        f"WARNING: {self._label(a)} "
-                        f"({a.start_time:%H:%M}-{a.end_time:%H:%M}) overlaps "
-                        f"{self._label(b)} "
-                        f"({b.start_time:%H:%M}-{b.end_time:%H:%M})"
-                    )
-        return warnings
+        schedule and never raises. It flags every pair of entries whose time
+        ranges overlap (two tasks share part of the same slot), whether they
+        belong to the same pet or different pets. Returns an empty list when
+        there are no conflicts.
+
+        Pairs are found with a sort + sweep (see iter_conflicts), so pooling a
+        large day costs O(n log n + k) rather than comparing every pair. The
+        warnings keep the old pairwise order: by the first entry's position in
+        `scheduled`, then by the second's. `scheduled` may be any iterable in
+        any order (a stream such as merge_by_time's is gathered into a list
+        first; sorting it is linear when it's already in time order).
+        """
+        if not isinstance(scheduled, Sequence):
+            scheduled = list(scheduled)
+        positions = itertools.count()
+        pairs = sorted(self._sweep(self._slots_in_time_order(scheduled, positions)))
+        if self.recorder is not None:
+            self.recorder.count("conflict_slots_checked", next(positions))
+            self.recorder.count("conflict_pairs", len(pairs))
+        return [self._conflict_message(a, b) for _, _, a, b in pairs]
+
+    def iter_conflicts(
+        self, scheduled: Iterable[ScheduledTask]
+    ) -> Iterator[tuple[ScheduledTask, ScheduledTask]]:
+        """Lazily yield each overlapping pair of slots as (earlier, later) in the input.
+
+        Sweeps the slots in start-time order while keeping a min-heap of the
+        still-open slots keyed by end time. When a slot starts, every open slot
+        that has already ended (end <= start, so back-to-back is fine) is
+        dropped; whatever is left overlaps the new slot. Total cost is
+        O(n log n + k) for k conflicts (O(n log n) drops to the heap work
+        alone for a stream already in time order), and pairs are yielded as
+        they're found, so a caller can stop as soon as it has seen enough.
 
-    def resolve_conflicts(self, scheduled: list[ScheduledTask]) -> None:
+        A list or other Sequence may be in any order. Any other iterable is
+        swept as it arrives without being copied, so it must already be in
+        (start, end) order (as merge_by_time's output is); a slot that
+        arrives out of order raises ValueError. count_conflicts and
+        has_conflicts share this rule; detect_conflicts accepts any order.
+        """
+        for _, _, a, b in self._sweep(self._slots_in_time_order(scheduled, itertools.count())):
+            yield a, b
+
+    @staticmethod
+    def _slots_in_time_order(
+        scheduled: Iterable[ScheduledTask], positions: Iterator[int]
+    ) -> Iterator[tuple[int, ScheduledTask]]:
+        """Yield (input position, slot) in (start, end) order.
+
+        A list is sorted (by index, not copied); any other iterable is
+        taken to be a stream already in that order and passed straight
+        through. One value is drawn from `positions` per slot (zip pulls the
+        slot first, so none is wasted at the end), leaving it at the slot
+        count once the input is used up.
+        """
+        if isinstance(scheduled, Sequence):
+            # Sorting by (start, end) puts zero-length slots ahead of the
+            # slots that start with them, so they're dropped before they can
+            # be reported as overlapping (matching the half-open overlap test).
+            order = sorted(range(len(scheduled)), key=lambda i: _slot_key(scheduled[i]))
+            for i, _ in zip(order, positions):
+                yield i, scheduled[i]
+            return
+        for entry, i in zip(scheduled, positions):
+            yield i, entry
+
+    @staticmethod
+    def _sweep(
+        slots: Iterable[tuple[int, ScheduledTask]]
+    ) -> Iterator[tuple[int, int, ScheduledTask, ScheduledTask]]:
+        """Yield overlapping pairs from (position, slot) items arriving in (start, end) order.
+
+        Each pair comes out as (lower position, higher position, slot, slot).
+        Raises ValueError if a slot arrives out of order.
+        """
+        active: list[tuple[int, int, ScheduledTask]] = []  # (end_minute, position, slot) heap
+        last = (-1, -1)
+        for i, entry in slots:
+            key = _slot_key(entry)
+            if key < last:
+                raise ValueError(
+                    f"Slots must arrive in start-time order: {entry.start_time:%H:%M} came after "
+                    f"{_TIMES_OF_DAY[last[0] % MINUTES_PER_DAY]:%H:%M}"
+                )
+            last = key
+            while active and active[0][0] <= entry.start_minute:
+                heapq.heappop(active)
+            for _, j, other in active:
+                yield (j, i, other, entry) if j < i else (i, j, entry, other)
+            heapq.heappush(active, (entry.end_minute, i, entry))
+
+    def count_conflicts(
+        self, scheduled: Iterable[ScheduledTask], *, limit: int | None = None
+    ) -> int:
+        """Count overlapping pairs without building warning strings.
+
+        Pass `limit` to stop counting once that many conflicts have been seen
+        (e.g. limit=1 answers "are there any conflicts?").
+        """
+        count = 0
+        for _ in self.iter_conflicts(scheduled):
+            count += 1
+            if limit is not None and count >= limit:
+                break
+        return count
+
+    def has_conflicts(self, scheduled: Iterable[ScheduledTask]) -> bool:
+        """Return True as soon as any two slots are found to overlap."""
+        return self.count_conflicts(scheduled, limit=1) > 0
+
+    @_timed("resolve_conflicts")
+    def resolve_conflicts(self, scheduled: Iterable[ScheduledTask]) -> None:
         """Push overlapping slots later so no two tasks share a time range.
 
-        Mutates the list in place, assuming it is already in start-time order.
+        Mutates the slots in place, assuming they come in start-time order
+        (a sorted list, or a stream such as merge_by_time's). Only the
+        previous slot is kept while iterating, so a stream is never copied.
         """
-        for i in range(1, len(scheduled)):
-            prev, curr = scheduled[i - 1], scheduled[i]
-            if curr.start_time < prev.end_time:
-                duration = self._minutes_between(curr.start_time, curr.end_time)
-                new_start = self._to_datetime(prev.end_time)
-                new_end = new_start + timedelta(minutes=duration)
-                curr.start_time = new_start.time()
-                curr.end_time = new_end.time()
+        shifts = 0
+        prev = None
+        for curr in scheduled:
+            if prev is not None and curr.start_minute < prev.end_minute:
+                duration = curr.end_minute - curr.start_minute
+                curr.start_minute = prev.end_minute
+                curr.end_minute = prev.end_minute + duration
+                shifts += 1
+            prev = curr
+        if self.recorder is not None:
+            self.recorder.count("resolve_shifts", shifts)
+
+    @classmethod
+    def _conflict_message(cls, a: ScheduledTask, b: ScheduledTask) -> str:
+        """Format the warning for one overlapping pair of slots."""
+        return (
+            f"WARNING: {cls._label(a)} "
+            f"({a.start_time:%H:%M}-{a.end_time:%H:%M}) overlaps "
+            f"{cls._label(b)} "
+            f"({b.start_time:%H:%M}-{b.end_time:%H:%M})"
+        )
 
     @staticmethod
     def _label(entry: ScheduledTask) -> str:
@@ -311,13 +2179,329 @@ class Scheduler:
             return f"{entry.pet_name}: '{entry.task.title}'"
         return f"'{entry.task.title}'"
 
-    @staticmethod
-    def _to_datetime(t: time) -> datetime:
-        """Anchor a time to an arbitrary date so timedelta math works."""
-        return datetime(2000, 1, 1, t.hour, t.minute)
 
-    @classmethod
-    def _minutes_between(cls, start: time, end: time) -> int:
-        """Return the number of whole minutes between two times of day."""
-        delta = cls._to_datetime(end) - cls._to_datetime(start)
-        return int(delta.total_seconds() // 60)
+# Every time of day a slot can start/end at, built once so reading
+# ScheduledTask.start_time/end_time never allocates.
+_TIMES_OF_DAY = [time(m // 60, m % 60) for m in range(MINUTES_PER_DAY)]
+# "HH:MM" for each minute of the day, so rendering a slot needs no strftime.
+_CLOCK_LABELS = [f"{m // 60:02d}:{m % 60:02d}" for m in range(MINUTES_PER_DAY)]
+
+
+def _slot_key(entry: ScheduledTask) -> tuple[int, int]:
+    """Chronological sort key for a slot: (start, end) minutes."""
+    return entry.start_minute, entry.end_minute
+
+
+def _to_minutes(t: time) -> int:
+    """Convert a time of day to whole minutes since midnight."""
+    return t.hour * 60 + t.minute
+
+
+class _Timeline:
+    """Where the next task can go while one plan is being built.
+
+    Tracks the budget left and either a cursor (tasks go back-to-back) or,
+    when windows or blocked time apply, the availability bitmap.
+    """
+
+    __slots__ = ("scheduler", "remaining", "cursor", "free")
+
+    def __init__(self, scheduler: Scheduler, tasks: Iterable[Task]) -> None:
+        """Start an empty timeline for planning `tasks` with `scheduler`."""
+        self.scheduler = scheduler
+        self.remaining = scheduler.available_minutes
+        self.cursor = _to_minutes(scheduler.start_time)
+        self.free = scheduler._free_minutes() if scheduler._needs_bitmap(tasks) else None
+
+    def place(self, task: Task, *, check_budget: bool = True) -> int | None:
+        """Reserve a slot for the task and return its start minute (None if it can't go in)."""
+        if check_budget and not self.scheduler.fits(task, self.remaining):
+            return None
+        if self.free is None:
+            start = self.cursor
+            self.cursor += task.duration_minutes
+        else:
+            start = self.scheduler._first_slot(task, self.free)
+            if start is None:
+                return None
+            self.free &= ~_minute_mask(start, start + task.duration_minutes)
+        self.remaining -= task.duration_minutes
+        return start
+
+
+# --- Availability bitmaps ------------------------------------------------
+# A day's open minutes are one Python int with bit m set when minute m is
+# free, so a plan's whole availability is a single 1440-bit value.
+
+
+def _minute_mask(start: int, end: int) -> int:
+    """Bitmap with the bits for minutes start..end-1 set."""
+    return ((1 << (end - start)) - 1) << start if end > start else 0
+
+
+def _first_fit(free: int, length: int, lo: int, hi: int) -> int | None:
+    """Earliest m in [lo, hi) whose `length` minutes m..m+length-1 are all free and end by hi.
+
+    Shifting the bitmap onto itself keeps only the bits that start a free run
+    of at least the requested length, doubling the checked run each step, so
+    the search takes O(log length) big-int operations rather than a scan
+    over minutes or entries. Returns None if there is no such gap.
+    """
+    if hi - lo < length:
+        return None
+    runs = (free >> lo) & ((1 << (hi - lo)) - 1)
+    span = 1
+    while span < length and runs:
+        step = min(span, length - span)
+        runs &= runs >> step
+        span += step
+    if not runs:
+        return None
+    return lo + (runs & -runs).bit_length() - 1
+
+
+class PlanCache:
+    """A bounded LRU (optionally TTL) cache of plans, keyed by task-list content.
+
+    The key is the scheduler's settings (budget, start time, strategy, blocked
+    time) plus a fingerprint of every task field the scheduler reads, in list
+    order. So a task changed in any way that affects planning simply produces
+    a new key, and its stale plan ages out of the LRU; changes that can't
+    affect the plan (a title, or a status flipped by mark_complete) keep
+    hitting. Two owners with the same routine share one entry.
+
+    Entries store plans as a layout (task positions + slot minutes), so a hit
+    is rebuilt against the caller's own Task objects and pet name, and every
+    caller gets a fresh Plan it is free to mutate.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float | None = None) -> None:
+        """Keep at most `maxsize` plans, each for at most `ttl` seconds (None = forever)."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple, tuple[float, tuple]] = OrderedDict()
+        self._lock = threading.Lock()  # build_plans may share one cache across threads
+
+    def get_plan(self, scheduler: Scheduler, tasks: list[Task], pet_name: str = "") -> Plan:
+        """Return the plan for `tasks`, building (and caching) it on a miss."""
+        key = (
+            scheduler.available_minutes,
+            scheduler.start_time,
+            scheduler.strategy,
+            scheduler.blocked,
+            tuple(map(_task_row, tasks)),
+        )
+        now = clock.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and (self.ttl is None or now - cached[0] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                layout = cached[1]
+            else:
+                layout = None
+                self.misses += 1
+        if layout is not None:
+            plan = _plan_from_layout(layout, tasks, pet_name)
+            plan.recorder = scheduler.recorder
+            return plan
+
+        plan = scheduler._build_uncached(tasks, pet_name)
+        with self._lock:
+            self._entries[key] = (now, _plan_layout(plan, tasks))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return plan
+
+    def clear(self) -> None:
+        """Drop every cached plan (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counts, the hit rate and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+
+class IncrementalPlanner:
+    """Keeps a live greedy Plan in sync with a changing task list.
+
+    Holds the tasks in the scheduler's priority order along with the planner
+    state (remaining budget, next start time, entries/skipped so far) in front
+    of each position. An edit only re-places tasks from the first position it
+    touches onward; everything before it is untouched. `plan` always equals
+    what `scheduler.build_plan(tasks, pet_name)` would return for the tasks in
+    the order they were added.
+    """
+
+    def __init__(self, scheduler: Scheduler, tasks: Iterable[Task] = (), pet_name: str = "") -> None:
+        """Plan an initial batch of tasks with the given (greedy) scheduler."""
+        if scheduler.strategy != "greedy":
+            raise ValueError("IncrementalPlanner only supports the greedy strategy")
+        self.scheduler = scheduler
+        self.pet_name = pet_name
+        self.plan = Plan(recorder=scheduler.recorder)
+        self._order: list[Task] = []  # tasks in priority order
+        self._keys: list[tuple] = []  # sort key of each position, for bisect
+        self._key_of: dict[int, tuple] = {}  # id(task) -> its current key
+        self._seq = itertools.count()  # insertion order breaks ties, like a stable sort
+        # Track an availability bitmap (as build_plan does) once blocked time
+        # or a task window rules out plain back-to-back placement.
+        self._windowed = bool(scheduler.blocked)
+        # _states[i] = (remaining, cursor, free, len(entries), len(skipped)) before position i.
+        self._states: list[tuple] = []
+        for task in tasks:
+            self._insert(task)
+        self._replay(0)
+
+    def add(self, task: Task) -> None:
+        """Add a task and re-place everything from its position on."""
+        self._replay(self._insert(task))
+
+    def remove(self, task: Task) -> None:
+        """Remove a task and re-place everything from its old position on."""
+        self._replay(self._delete(task))
+
+    def complete(self, task: Task) -> Task | None:
+        """Mark a task complete and add its next occurrence, if any.
+
+        Like Pet.complete_task; completed tasks stay in the plan (build_plan
+        doesn't filter on status), so only the follow-up changes the plan.
+        """
+        follow_up = task.mark_complete()
+        if follow_up is not None:
+            self.add(follow_up)
+        return follow_up
+
+    def set_duration(self, task: Task, minutes: int) -> None:
+        """Change a task's duration and re-place from the earliest affected position."""
+        task.duration_minutes = minutes
+        self.update(task)
+
+    def update(self, task: Task) -> None:
+        """Re-sort a task after its priority or duration was changed directly."""
+        seq = self._key_of[id(task)][-1]
+        start = self._delete(task)
+        self._replay(min(start, self._insert(task, seq)))
+
+    def _insert(self, task: Task, seq: int | None = None) -> int:
+        """Put a task at its priority position (no replay); return where replay must start."""
+        key = (-task.priority_rank(), task.duration_minutes, next(self._seq) if seq is None else seq)
+        position = bisect.bisect(self._keys, key)
+        self._keys.insert(position, key)
+        self._order.insert(position, task)
+        self._key_of[id(task)] = key
+        if not self._windowed and self.scheduler._needs_bitmap((task,)):
+            self._windowed = True
+            return 0  # earlier states have no bitmap; rebuild them all
+        return position
+
+    def _delete(self, task: Task) -> int:
+        """Take a task out of the order (no replay); return its old position."""
+        key = self._key_of.pop(id(task))
+        position = bisect.bisect_left(self._keys, key)
+        del self._keys[position]
+        del self._order[position]
+        return position
+
+    def _replay(self, start: int) -> None:
+        """Rewind the plan to the state before `start`, then greedily re-place the rest."""
+        plan = self.plan
+        del self._states[start:]
+        scheduler = self.scheduler
+        if start == 0:
+            remaining = scheduler.available_minutes
+            cursor = _to_minutes(scheduler.start_time)
+            free = scheduler._free_minutes() if self._windowed else None
+            n_entries = n_skipped = 0
+        else:
+            remaining, cursor, free, n_entries, n_skipped = self._states_after(start - 1)
+        del plan.entries[n_entries:]
+        del plan.skipped[n_skipped:]
+
+        for task in self._order[start:]:
+            self._states.append((remaining, cursor, free, len(plan.entries), len(plan.skipped)))
+            slot = None
+            if scheduler.fits(task, remaining):
+                slot = cursor if free is None else scheduler._first_slot(task, free)
+            if slot is not None:
+                end = slot + task.duration_minutes
+                plan.entries.append(
+                    ScheduledTask(task=task, start_minute=slot, end_minute=end, pet_name=self.pet_name)
+                )
+                if free is None:
+                    cursor = end
+                else:
+                    free &= ~_minute_mask(slot, end)
+                remaining -= task.duration_minutes
+            else:
+                plan.skipped.append(task)
+        plan.total_minutes = scheduler.available_minutes - remaining
+
+    def _states_after(self, position: int) -> tuple:
+        """Planner state right after the task at `position` was handled."""
+        remaining, cursor, free, n_entries, n_skipped = self._states[position]
+        task = self._order[position]
+        if n_entries < len(self.plan.entries) and self.plan.entries[n_entries].task is task:
+            entry = self.plan.entries[n_entries]
+            if free is None:
+                cursor = entry.end_minute
+            else:
+                free &= ~_minute_mask(entry.start_minute, entry.end_minute)
+            return remaining - task.duration_minutes, cursor, free, n_entries + 1, n_skipped
+        return remaining, cursor, free, n_entries, n_skipped + 1
+
+
+# --- Batch planning helpers ----------------------------------------------
+# Process-pool workers can't share Task objects with the parent, so a task is
+# shipped as a small tuple and the plan comes back as a "layout": positions
+# into the caller's task list plus slot times. Module-level so they pickle.
+
+
+def _task_row(task: Task) -> tuple:
+    """Reduce a task to just the fields the scheduler looks at."""
+    return (task.duration_minutes, task.priority, task.earliest, task.latest)
+
+
+def _plan_layout(plan: Plan, tasks: list[Task]) -> tuple[list[tuple], list[int]]:
+    """Describe a plan by task position: ([(index, start, end), ...], [skipped index, ...])."""
+    position = {id(task): i for i, task in enumerate(tasks)}
+    placed = [(position[id(e.task)], e.start_minute, e.end_minute) for e in plan.entries]
+    skipped = [position[id(task)] for task in plan.skipped]
+    return placed, skipped
+
+
+def _plan_from_layout(layout: tuple[list[tuple], list[int]], tasks: list[Task], pet_name: str) -> Plan:
+    """Rebuild a Plan from a layout against the caller's own Task objects."""
+    placed, skipped = layout
+    plan = Plan()
+    for index, start, end in placed:
+        plan.add_entry(
+            ScheduledTask(task=tasks[index], start_minute=start, end_minute=end, pet_name=pet_name)
+        )
+    plan.skipped = [tasks[index] for index in skipped]
+    return plan
+
+
+def _layout_rows(scheduler: Scheduler, pets_rows: list[list[tuple]]) -> list[tuple]:
+    """Worker entry point: plan each pet's task rows and return their layouts."""
+    layouts = []
+    for rows in pets_rows:
+        tasks = [
+            Task("", duration, priority, earliest=earliest, latest=latest)
+            for duration, priority, earliest, latest in rows
+        ]
+        layouts.append(_plan_layout(scheduler.build_plan(tasks), tasks))
+    return layouts
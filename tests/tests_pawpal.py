@@ -1,13 +1,41 @@
 """Tests for PawPal+ core behaviors."""
 
+import asyncio
+import copy
+import io
+import json
 import os
+import pickle
 import sys
-from datetime import date, time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import date, time, timedelta
+
+import pytest
 
 # Allow importing pawpal_system.py from the project root.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from pawpal_system import Pet, ScheduledTask, Scheduler, Task
+import pawpal
+from benchmarks.bench_pawpal import compare, make_owners
+from pawpal_io import load_owners, write_plan_csv, write_plan_jsonl, write_plan_text
+from pawpal_metrics import JsonLinesSink, MemorySink, Recorder
+from pawpal_service import PlanningService
+from pawpal_storage import SQLiteStore, read_snapshot, write_snapshot
+from pawpal_system import (
+    IncrementalPlanner,
+    Occurrence,
+    Owner,
+    Pet,
+    Plan,
+    PlanCache,
+    ScheduledTask,
+    Scheduler,
+    Task,
+    TaskSeries,
+    TaskStore,
+    TaskTemplate,
+)
 
 
 def test_task_completion_changes_status():
@@ -123,6 +151,43 @@ def test_detect_conflicts_allows_back_to_back_slots():
     assert scheduler.detect_conflicts([a, b]) == []
 
 
+def test_merged_timeline_streams_into_conflict_checks_and_resolution():
+    """merge_by_time should interleave per-pet plans lazily and feed the conflict tools."""
+    scheduler = Scheduler(available_minutes=60)
+    mochi = scheduler.build_plan([Task("Walk", 30, "high"), Task("Brush", 20, "low")], pet_name="Mochi")
+    luna = Scheduler(60, start_time=time(8, 10)).build_plan([Task("Feed", 10)], pet_name="Luna")
+
+    merged = scheduler.merge_by_time([mochi, luna.entries])
+    assert not isinstance(merged, list)
+    assert [e.task.title for e in merged] == ["Walk", "Feed", "Brush"]
+    assert scheduler.detect_conflicts(scheduler.merge_by_time([mochi, luna])) == [
+        "WARNING: Mochi: 'Walk' (08:00-08:30) overlaps Luna: 'Feed' (08:10-08:20)"
+    ]
+
+    scheduler.resolve_conflicts(scheduler.merge_by_time([mochi, luna]))
+    assert [(e.start_time, e.end_time) for e in luna.entries + mochi.entries[1:]] == [
+        (time(8, 30), time(8, 40)),
+        (time(8, 40), time(9, 0)),
+    ]
+    assert not scheduler.has_conflicts(scheduler.merge_by_time([mochi, luna]))
+
+
+def test_detect_conflicts_takes_unordered_streams():
+    """detect_conflicts should take any iterable in any order; the lazy counters want streams in start order."""
+    scheduler = Scheduler(available_minutes=60)
+    entries = [
+        ScheduledTask(Task("Play", 30), start_time=time(9, 0), end_time=time(9, 30)),
+        ScheduledTask(Task("Walk", 30), start_time=time(8, 0), end_time=time(8, 30)),
+        ScheduledTask(Task("Bath", 30), start_time=time(8, 50), end_time=time(9, 20)),
+    ]
+    assert scheduler.detect_conflicts(iter(entries)) == scheduler.detect_conflicts(entries) == [
+        "WARNING: 'Play' (09:00-09:30) overlaps 'Bath' (08:50-09:20)"  # pairs keep input order
+    ]
+    assert scheduler.detect_conflicts(reversed(entries)) == scheduler.detect_conflicts(entries[::-1])
+    with pytest.raises(ValueError, match="start-time order"):
+        scheduler.count_conflicts(iter(entries))
+
+
 # --- Scheduling / budget edge cases --------------------------------------
 
 
@@ -149,3 +214,877 @@ def test_build_plan_orders_by_priority_high_first():
     plan = scheduler.build_plan([low, high, medium])
 
     assert [e.task.title for e in plan.entries] == ["Meds", "Play", "Brush"]
+
+
+def test_detect_conflicts_matches_pairwise_check():
+    """The sweep should report exactly the pairs a brute-force pairwise check finds."""
+    scheduler = Scheduler(available_minutes=240)
+    slots = [
+        ScheduledTask(Task("A", 30), start_time=time(8, 0), end_time=time(8, 30)),
+        ScheduledTask(Task("B", 0), start_time=time(8, 30), end_time=time(8, 30)),
+        ScheduledTask(Task("C", 60), start_time=time(7, 45), end_time=time(8, 45)),
+        ScheduledTask(Task("D", 15), start_time=time(8, 30), end_time=time(8, 45)),
+        ScheduledTask(Task("E", 10), start_time=time(9, 0), end_time=time(9, 10)),
+    ]
+    expected = [
+        (a.task.title, b.task.title)
+        for i, a in enumerate(slots)
+        for b in slots[i + 1:]
+        if a.start_time < b.end_time and b.start_time < a.end_time
+    ]
+
+    found = sorted((a.task.title, b.task.title) for a, b in scheduler.iter_conflicts(slots))
+
+    assert found == sorted(expected)
+    assert len(scheduler.detect_conflicts(slots)) == len(expected)
+    assert scheduler.count_conflicts(slots) == len(expected)
+    assert scheduler.count_conflicts(slots, limit=1) == 1
+    assert scheduler.has_conflicts(slots[-1:]) is False
+
+
+# --- Batch planning ------------------------------------------------------
+
+
+def test_build_plans_matches_per_pet_plans_in_order():
+    """Batch planning (threads or processes) should equal planning each pet alone."""
+    scheduler = Scheduler(available_minutes=45, start_time=time(8, 0))
+    pets = []
+    for n in range(5):
+        pet = Pet(f"Pet{n}", species="dog")
+        pet.add_task(Task("Walk", duration_minutes=30 + n, priority="high"))
+        pet.add_task(Task("Feed", duration_minutes=10, priority="medium"))
+        pet.add_task(Task("Brush", duration_minutes=15, priority="low"))
+        pets.append(pet)
+
+    expected = [scheduler.build_plan(p.list_tasks(), pet_name=p.name).to_table() for p in pets]
+
+    threaded = scheduler.build_plans(pets, chunk_size=2, max_workers=2)
+    pooled = scheduler.build_plans(pets, chunk_size=2, max_workers=2, use_processes=True)
+
+    assert [p.to_table() for p in threaded] == expected
+    assert [p.to_table() for p in pooled] == expected
+    # Process results still point at the caller's own Task objects.
+    assert pooled[0].entries[0].task is pets[0].tasks[0]
+    assert pooled[4].skipped == [pets[4].tasks[2]]
+
+
+def test_optimal_strategy_uses_budget_greedy_wastes():
+    """The knapsack planner should fill minutes the greedy packing leaves idle."""
+    tasks = [
+        Task("Short walk", duration_minutes=20, priority="medium"),
+        Task("Groom", duration_minutes=30, priority="medium"),
+        Task("Play", duration_minutes=30, priority="medium"),
+    ]
+    greedy = Scheduler(available_minutes=60).build_plan(tasks)
+    optimal = Scheduler(available_minutes=60, strategy="optimal").build_plan(tasks)
+
+    assert greedy.total_minutes == 50
+    assert optimal.total_minutes == 60
+    assert [e.task.title for e in optimal.entries] == ["Groom", "Play"]
+    assert optimal.skipped == [tasks[0]]
+    assert optimal.entries[1].start_time == time(8, 30)
+
+
+def test_optimal_strategy_sizes_its_table_by_the_tasks_not_the_budget():
+    """A budget past the tasks' total (even past a day) should neither blow up the table nor place less than greedy."""
+    tasks = [Task(f"Task {i}", duration_minutes=100) for i in range(20)]
+    for budget in (2000, 10**9):
+        optimal = Scheduler(available_minutes=budget, strategy="optimal")
+        greedy = Scheduler(available_minutes=budget)
+        assert optimal._knapsack_capacity(tasks, budget) == min(budget, 2000)
+        assert optimal.build_plan(tasks).total_minutes == greedy.build_plan(tasks).total_minutes == 2000
+
+
+def test_budget_sweep_matches_a_plan_per_budget():
+    """sweep_budgets should agree with build_plan at every budget, for both strategies."""
+    tasks = [
+        Task("Short walk", duration_minutes=20, priority="medium"),
+        Task("Groom", duration_minutes=30, priority="medium"),
+        Task("Play", duration_minutes=30, priority="medium"),
+        Task("Meds", duration_minutes=5, priority="high"),
+    ]
+    for strategy in ("greedy", "optimal"):
+        sweep = Scheduler(available_minutes=0, strategy=strategy).sweep_budgets(tasks, range(0, 100, 5))
+        for row in sweep.iter_rows():
+            plan = Scheduler(row["available_minutes"], strategy=strategy).build_plan(tasks)
+            assert row["total_minutes"] == plan.total_minutes
+            assert sweep.placed_tasks(row["available_minutes"]) == [e.task for e in plan.entries]
+            assert sweep.skipped_tasks(row["available_minutes"]) == plan.skipped
+    assert [t.title for t in sweep.placed_tasks(65)] == ["Meds", "Groom", "Play"]
+
+
+# --- Columnar task store -------------------------------------------------
+
+
+def test_task_store_backs_pet_tasks():
+    """A TaskStore-backed pet should behave like one holding a plain list."""
+    pet = Pet("Mochi", species="dog", tasks=TaskStore())
+    pet.add_task(Task("Walk", 30, priority="high", category="walk"))
+    pet.add_task(Task("Feed", 10, recurrence="daily", due_date=date(2026, 6, 20)))
+    pet.add_task(Task("Brush", 15, priority="low"))
+
+    pet.remove_task(2)
+    follow_up = pet.complete_task(1)
+
+    titles = [t.title for t in pet.list_tasks()]
+    assert titles == ["Walk", "Feed", "Feed"]
+    assert pet.tasks[1].is_complete() is True
+    assert pet.tasks[2].due_date == follow_up.due_date == date(2026, 6, 21)
+    assert pet.tasks[0].priority_rank() == 3
+    # Views are cached while held, and compare equal to the task they store.
+    assert pet.tasks[0] is pet.tasks[0]
+    assert pet.tasks[0] == Task("Walk", 30, priority="high", category="walk")
+
+    owner = Owner("Jordan")
+    owner.add_pet(pet)
+    assert [t.title for t in owner.find_tasks(completed=False)] == ["Walk", "Feed"]
+    plan = Scheduler(available_minutes=60).build_plan(pet.list_tasks())
+    assert [e.task.title for e in plan.entries] == ["Walk", "Feed", "Feed"]
+
+
+def test_task_store_reorders_and_slices_like_a_list():
+    """Swaps, reverse() and slice assignment/deletion should match a plain list."""
+    titles = ["a", "b", "c", "d", "e"]
+    store = TaskStore(Task(title, 5) for title in titles)
+    plain = [Task(title, 5) for title in titles]
+    for tasks in (store, plain):
+        tasks.reverse()
+        tasks[0], tasks[1] = tasks[1], tasks[0]
+        tasks[::2] = tasks[::-2]
+        del tasks[1:3]
+        tasks[1:1] = [Task("x", 1), Task("y", 1)]
+        tasks[0] = tasks[2]
+        tasks[2].title = "X"
+    assert [t.title for t in store] == [t.title for t in plain] == ["X", "x", "X", "b", "d"]
+    store.append(Task("z", 1))  # reuses a freed row without touching the others
+    assert [t.title for t in store] == ["X", "x", "X", "b", "d", "z"]
+
+
+# --- Task indexes --------------------------------------------------------
+
+
+def test_find_tasks_indexes_follow_task_changes():
+    """Index-backed filters should stay correct through adds, removes and completions."""
+    owner = Owner("Jordan")
+    mochi = Pet("Mochi", species="dog")
+    luna = Pet("Luna", species="cat")
+    owner.add_pet(mochi)
+    owner.add_pet(luna)
+    mochi.add_task(Task("Walk", 30, category="walk"))
+    mochi.add_task(Task("Feed", 10, category="feeding", recurrence="daily", due_date=date(2026, 6, 20)))
+    mochi.add_task(Task("Brush", 15, category="grooming"))
+    luna.add_task(Task("Feed", 5, category="feeding"))
+
+    mochi.complete_task(1)  # appends tomorrow's Feed
+    luna.tasks[0].mark_complete()  # completed outside the pet's own methods
+    mochi.remove_task(2)  # Brush
+
+    assert [t.title for t in owner.find_tasks(completed=True)] == ["Feed", "Feed"]
+    assert [t.title for t in owner.find_tasks(completed=False, pet_name="MOCHI")] == ["Walk", "Feed"]
+    assert len(owner.find_tasks(category="feeding")) == 3
+    assert owner.find_tasks(category="feeding", completed=False)[0].due_date == date(2026, 6, 21)
+    assert owner.find_tasks(due_date=date(2026, 6, 20), pet_name="mochi")[0].is_complete()
+    assert owner.find_tasks(category="grooming") == []
+    assert owner.find_tasks(pet_name="Rex") == []
+
+
+def test_pet_name_filter_follows_current_pets_and_names():
+    """pet_name filters should see pets appended directly and match renamed pets by their new name."""
+    owner = Owner("Jordan")
+    mochi = Pet("Mochi", species="dog", tasks=[Task("Walk", 30, recurrence="daily")])
+    owner.pets.append(mochi)  # not via add_pet
+    assert [t.title for t in owner.find_tasks(pet_name="mochi")] == ["Walk"]
+
+    mochi.name = "Rex"
+    assert owner.find_tasks(pet_name="Mochi") == []
+    assert [t.title for t in owner.find_tasks(pet_name="REX")] == ["Walk"]
+    assert [t.title for t in owner.tasks_due_on(date(2026, 6, 1), pet_name="rex")] == ["Walk"]
+
+
+def test_find_tasks_keeps_list_order_and_skips_index_for_task_stores():
+    """Results should follow list order after re-filing; TaskStore pets should never build an index."""
+    for tasks in ([], TaskStore()):
+        mochi = Pet("Mochi", species="dog", tasks=tasks)
+        for title in ("Walk", "Feed", "Brush", "Play"):
+            mochi.add_task(Task(title, 10, category="care"))
+        assert len(mochi.find_tasks(category="care")) == 4
+        mochi.tasks[0].category = "walk"
+        mochi.reindex(mochi.tasks[0])
+        mochi.tasks[0].category = "care"
+        mochi.reindex(mochi.tasks[0])
+        mochi.complete_task(2)
+        mochi.tasks[2].status = "pending"
+        mochi.reindex(mochi.tasks[2])
+        assert [t.title for t in mochi.find_tasks(category="care")] == ["Walk", "Feed", "Brush", "Play"]
+        assert [t.title for t in mochi.find_tasks(completed=False)] == ["Walk", "Feed", "Brush", "Play"]
+        assert (mochi._index is None) == isinstance(tasks, TaskStore)
+
+
+def test_direct_task_edits_need_reindex():
+    """Queries should leave the caller's Task objects alone; direct edits show up after Pet.reindex."""
+    walk = Task("Walk", 30, category="walk")
+    mochi = Pet("Mochi", species="dog")
+    mochi.add_task(walk)
+    assert mochi.find_tasks(category="walk") == [walk] and mochi.get_task(walk.id) is walk
+    assert type(walk) is Task and type(replace(walk, title="Run")) is Task
+
+    walk.category = "exercise"
+    assert mochi.find_tasks(category="walk") == [walk]  # still filed under its old value
+    mochi.reindex(walk)
+    assert mochi.find_tasks(category="walk") == [] and mochi.find_tasks(category="exercise") == [walk]
+
+
+def test_indexed_tasks_and_pets_copy_and_pickle():
+    """Copies of queried tasks and pets should be equal, detached and re-indexable."""
+    mochi = Pet("Mochi", species="dog")
+    mochi.add_task(Task("Walk", 30, category="walk"))
+    mochi.add_task(Task("Feed", 10, category="feeding", due_date=date(2026, 6, 20)))
+    assert len(mochi.find_tasks(completed=False)) == 2
+
+    walk = mochi.tasks[0]
+    for clone in (copy.copy(walk), copy.deepcopy(walk), pickle.loads(pickle.dumps(walk))):
+        assert clone == walk and clone.id == walk.id
+        clone.mark_complete()
+        assert not walk.is_complete()
+
+    for clone in (copy.deepcopy(mochi), pickle.loads(pickle.dumps(mochi))):
+        assert clone == mochi
+        clone.tasks[1].mark_complete()
+        assert [t.title for t in clone.find_tasks(completed=False)] == ["Walk"]
+    assert len(mochi.find_tasks(completed=False)) == 2
+
+
+def test_priority_queue_tracks_edits_without_sorting():
+    """Pet.tasks_by_priority should match sort_by_priority through adds, removes and edits."""
+    scheduler = Scheduler(available_minutes=45)
+    for tasks in ([], TaskStore()):
+        mochi = Pet("Mochi", species="dog", tasks=tasks)
+        for title, minutes, priority in [("Walk", 30, "high"), ("Brush", 15, "low"), ("Feed", 10, "high"), ("Play", 10, "medium")]:
+            mochi.add_task(Task(title, minutes, priority))
+        assert [t.title for t in mochi.tasks_by_priority()] == ["Feed", "Walk", "Play", "Brush"]
+
+        mochi.tasks[1].priority = "high"  # Brush
+        mochi.reindex(mochi.tasks[1])
+        mochi.tasks[0].duration_minutes = 5  # Walk
+        mochi.reindex(mochi.tasks[0])
+        mochi.remove_task(2)  # Feed
+        mochi.add_task(Task("Meds", 5, "high"))
+        assert [t.title for t in mochi.tasks_by_priority()] == ["Walk", "Meds", "Brush", "Play"]
+        assert mochi.tasks_by_priority() == scheduler.sort_by_priority(list(mochi.tasks))
+        assert scheduler.plan_pet(mochi).to_table() == scheduler.build_plan(mochi.list_tasks()).to_table()
+
+
+def test_cold_pets_plan_by_sorting_and_index_once_under_threads():
+    """A pet never queried should be planned by sorting; threads racing to index it should agree."""
+    scheduler = Scheduler(available_minutes=45)
+    cold = Pet("Luna", species="cat", tasks=[Task(f"T{i}", i % 7 + 1, ("low", "high")[i % 2]) for i in range(200)])
+    assert scheduler.plan_pet(cold).to_table() == scheduler.build_plan(cold.tasks).to_table()
+    assert cold._index is None
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        orders = list(pool.map(lambda _: cold.tasks_by_priority(), range(8)))
+    assert all(order == scheduler.sort_by_priority(cold.tasks) for order in orders)
+    assert sum(map(len, cold._index.by_rank.values())) == 200  # each task filed once
+
+
+def test_task_ids_stay_valid_across_edits():
+    """Tasks should be reachable by id after other tasks are removed, on lists and TaskStores."""
+    owner = Owner("Jordan")
+    mochi = Pet("Mochi", species="dog")
+    luna = Pet("Luna", species="cat", tasks=TaskStore())
+    owner.add_pet(mochi)
+    owner.add_pet(luna)
+    walk, twin, meds = Task("Walk", 30), Task("Walk", 30), Task("Meds", 5, recurrence="daily")
+    for task in (walk, twin, meds):
+        mochi.add_task(task)
+    luna.add_task(Task("Feed", 10))
+    luna.add_task(Task("Play", 20))
+    feed_id, play_id = (t.id for t in luna.tasks)
+    plan = Scheduler(available_minutes=60).build_plan(mochi.tasks, pet_name="Mochi")
+
+    assert owner.remove_task(twin.id) is twin  # not its equal-valued twin
+    assert mochi.tasks == [walk, meds] and mochi.tasks[0] is walk
+    follow_up = owner.complete_task(meds.id)
+    assert mochi.get_task(follow_up.id) is follow_up and meds.is_complete()
+    assert plan.entry_for(meds.id).task_id == meds.id and plan.entry_for(follow_up.id) is None
+
+    assert luna.remove_task_by_id(feed_id).title == "Feed"
+    assert owner.pet_for_task(play_id) is luna and luna.get_task(play_id).title == "Play"
+    assert luna.tasks[0].to_task().id == play_id
+
+    with pytest.raises(KeyError):
+        owner.get_task(feed_id)
+
+
+def test_removed_and_re_added_stored_tasks_are_found_by_id():
+    """Removing and re-adding a stored task should not leave its old row findable; new tasks map to their pet."""
+    owner = Owner("Jordan")
+    mochi = Pet("Mochi", species="dog")
+    luna = Pet("Luna", species="cat", tasks=TaskStore([Task("Play", 20)]))
+    owner.add_pet(mochi)
+    owner.add_pet(luna)
+    play_id = luna.tasks[0].id
+
+    play = luna.remove_task_by_id(play_id).to_task()
+    luna.add_task(play)
+    assert owner.remove_task(play_id).title == "Play" and len(luna.tasks) == 0
+    luna.add_task(play)
+    mochi.add_task(Task("Bath", 20))
+    assert owner.pet_for_task(play_id) is luna and owner.pet_for_task(mochi.tasks[-1].id) is mochi
+
+
+# --- Incremental planning ------------------------------------------------
+
+
+def test_incremental_planner_matches_full_rebuild():
+    """After every edit, the live plan should equal a from-scratch build_plan."""
+    scheduler = Scheduler(available_minutes=60, start_time=time(8, 0))
+    tasks = [
+        Task("Walk", 30, priority="high"),
+        Task("Feed", 10, priority="high", recurrence="daily", due_date=date(2026, 6, 20)),
+        Task("Brush", 20, priority="low"),
+        Task("Play", 25, priority="medium"),
+    ]
+    planner = IncrementalPlanner(scheduler, tasks, pet_name="Mochi")
+
+    def assert_matches_rebuild():
+        expected = scheduler.build_plan(tasks, pet_name="Mochi")
+        assert planner.plan.to_table() == expected.to_table()
+        assert planner.plan.skipped == expected.skipped
+        assert planner.plan.total_minutes == expected.total_minutes
+
+    assert_matches_rebuild()
+    extra = Task("Meds", 5, priority="high")
+    planner.add(extra)
+    tasks.append(extra)
+    assert_matches_rebuild()
+    planner.set_duration(tasks[0], 15)
+    assert_matches_rebuild()
+    tasks.append(planner.complete(tasks[1]))
+    assert_matches_rebuild()
+    planner.remove(tasks[3])
+    del tasks[3]
+    assert_matches_rebuild()
+    tasks[2].priority = "high"
+    planner.update(tasks[2])
+    assert_matches_rebuild()
+
+
+# --- Lazy recurrence expansion -------------------------------------------
+
+
+def test_occurrences_expand_lazily_across_missed_days():
+    """A recurring task should keep yielding dates after a missed stretch, without copies."""
+    weekly = Task("Bath", 20, recurrence="weekly", due_date=date(2026, 6, 1))
+    daily = Task("Meds", 5, recurrence="daily", due_date=date(2026, 6, 28))
+    one_off = Task("Vet", 45, due_date=date(2026, 6, 30))
+
+    assert list(weekly.occurrences(date(2026, 6, 20), date(2026, 7, 10))) == [
+        date(2026, 6, 22), date(2026, 6, 29), date(2026, 7, 6),
+    ]
+    assert weekly.is_due_on(date(2026, 6, 29)) is True
+    assert weekly.is_due_on(date(2026, 6, 30)) is False
+    assert list(one_off.occurrences(date(2026, 6, 1), date(2026, 6, 29))) == []
+
+    owner = Owner("Jordan")
+    mochi = Pet("Mochi", species="dog", tasks=[weekly, daily, one_off])
+    owner.add_pet(mochi)
+    assert owner.tasks_due_on(date(2026, 6, 29)) == [weekly, daily]
+    assert owner.tasks_due_on(date(2026, 6, 30), pet_name="mochi") == [one_off, daily]
+
+    due = [(d, t.title) for d, _, t in owner.iter_due(date(2026, 6, 28), date(2026, 6, 29))]
+    assert due == [(date(2026, 6, 28), "Meds"), (date(2026, 6, 29), "Bath"), (date(2026, 6, 29), "Meds")]
+
+
+def test_undated_series_follow_one_rule_in_is_due_on_and_occurrences():
+    """Undated recurring tasks should be due on the same days whichever of the two is asked."""
+    window = [date(2026, 6, 1) + timedelta(days=n) for n in range(21)]
+    for task in (Task("Brush", 10, recurrence="weekly"), Task("Feed", 5, recurrence="daily")):
+        assert [day for day in window if task.is_due_on(day)] == list(task.occurrences(window[0], window[-1]))
+    assert list(Task("Brush", 10, recurrence="weekly").occurrences(window[0], window[-1]))[0].weekday() == 0
+
+
+def test_tasks_due_on_treats_unknown_recurrences_as_one_offs():
+    """A task with a recurrence such as "monthly" should be due on its due_date, for lists and TaskStores."""
+    day = date(2026, 6, 15)
+    for tasks in ([], TaskStore()):
+        mochi = Pet("Mochi", species="dog", tasks=tasks)
+        mochi.add_task(Task("Flea drops", 5, recurrence="monthly", due_date=day))
+        mochi.add_task(Task("Walk", 30, recurrence="daily", due_date=day))
+        assert [t.title for t in mochi.tasks_due_on(day)] == ["Flea drops", "Walk"]
+        assert [t.title for t in mochi.tasks_due_on(day + timedelta(days=1))] == ["Walk"]
+
+
+def test_scheduled_task_stores_minutes_and_derives_times():
+    """Slots keep integer minutes; time objects are derived views that round-trip."""
+    slot = ScheduledTask(Task("Walk", 30), start_time=time(23, 50), end_time=time(0, 20))
+    assert (slot.start_minute, slot.end_minute) == (23 * 60 + 50, 20)
+
+    plan = Scheduler(available_minutes=60, start_time=time(23, 45)).build_plan(
+        [Task("Walk", 30), Task("Feed", 10)]
+    )
+    assert [(e.start_minute, e.end_minute) for e in plan.entries] == [(1425, 1435), (1435, 1465)]
+    # Display wraps past midnight just like datetime.time arithmetic did.
+    assert plan.entries[1].end_time == time(0, 25)
+
+    plan.entries[1].start_time = time(23, 40)
+    assert plan.entries[1].start_minute == 1420
+
+
+# --- Task templates ------------------------------------------------------
+
+
+def test_series_revisions_reach_only_later_occurrences():
+    """Occurrences share their series' template; revisions apply from their date on."""
+    series = TaskSeries(TaskTemplate("Meds", 5, priority="high", recurrence="daily"))
+    pet = Pet(name="Mochi", species="dog")
+    pet.add_task(series.occurrence(date(2026, 3, 1)))
+    follow_up = pet.complete_task(0)
+    assert isinstance(follow_up, Occurrence) and follow_up.due_date == date(2026, 3, 2)
+    assert pet.find_tasks(completed=False) == [follow_up]
+
+    series.revise(date(2026, 3, 2), duration_minutes=10, category="meds")
+    assert pet.tasks[0].duration_minutes == 5 and follow_up.duration_minutes == 10
+    assert pet.find_tasks(category="meds") == [follow_up]  # the index saw the revision
+
+    follow_up.priority = "low"  # copy-on-write: only this occurrence changes
+    assert follow_up.priority == "low" and series.template.priority == "high"
+    assert follow_up.next_occurrence().priority == "high"
+    assert follow_up.to_task() == Task("Meds", 10, "low", "meds", "daily", due_date=date(2026, 3, 2))
+
+
+# --- Horizon planning ----------------------------------------------------
+
+
+def test_horizon_expands_recurrences_and_carries_leftovers_forward():
+    """build_horizon should plan each day's due tasks and escalate what didn't fit."""
+    first = date(2026, 6, 1)
+    tasks = [
+        Task("Meds", 5, "high", recurrence="daily"),
+        Task("Walk", 30, "high", recurrence="daily", due_date=first),
+        Task("Groom", 40, "high", due_date=first),
+        Task("Vet", 45, "medium", due_date=date(2026, 5, 30)),  # two days overdue
+        Task("Bath", 50, "low", recurrence="weekly", due_date=date(2026, 5, 27)),
+        Task("Done", 5, due_date=first, status="complete"),
+    ]
+    plans = Scheduler(available_minutes=80).build_horizon(tasks, first, days=4)
+
+    assert list(plans) == [date(2026, 6, d) for d in (1, 2, 3, 4)]
+    titles = {day.day: [e.task.title for e in plan.entries] for day, plan in plans.items()}
+    assert titles == {
+        1: ["Vet", "Meds", "Walk"],  # the overdue Vet visit outranks fresh high-priority work
+        2: ["Groom", "Meds", "Walk"],  # yesterday's Groom now beats today's tasks
+        3: ["Meds", "Walk"],
+        4: ["Meds", "Walk"],
+    }
+    assert plans[date(2026, 6, 3)].skipped == [tasks[4]] and plans[date(2026, 6, 4)].skipped == [tasks[4]]
+    assert plans[date(2026, 6, 2)].entries[1].task is tasks[0]  # occurrences reuse the Task
+
+    with pytest.raises(ValueError):
+        Scheduler(available_minutes=80).build_horizon(tasks, first, days=-1)
+
+
+def test_horizon_plans_undated_and_unknown_recurrence_tasks_once():
+    """Undated one-offs, and tasks with a recurrence the planner doesn't know, should be planned like one-offs."""
+    first = date(2026, 6, 1)
+    tasks = [
+        Task("Nails", 15),
+        Task("Flea drops", 5, recurrence="monthly"),  # undated: planned on the first day
+        Task("Worming", 10, recurrence="monthly", due_date=date(2026, 5, 20)),  # overdue: carried in
+    ]
+    plans = Scheduler(available_minutes=80).build_horizon(tasks, first, days=2)
+    titles = [[e.task.title for e in plan.entries] for plan in plans.values()]
+    assert titles == [["Worming", "Flea drops", "Nails"], []]
+
+
+# --- Plan diffs ----------------------------------------------------------
+
+
+def test_plan_diff_reports_only_changed_slots():
+    """Plan.diff should sort slots into added/removed/moved/retimed by task id."""
+    walk, feed, brush, play = Task("Walk", 30, "high"), Task("Feed", 10, "high"), Task("Brush", 20), Task("Play", 15)
+
+    def slot(task, start):
+        return ScheduledTask(task, start_minute=start, end_minute=start + task.duration_minutes)
+
+    before = Plan(entries=[slot(walk, 480), slot(feed, 510), slot(brush, 600)], skipped=[play])
+    after = Plan(entries=[slot(play, 470), slot(brush, 600), slot(feed, 520)], skipped=[])
+
+    changes = after.diff(before)
+    assert [e.task for e in changes.added] == [play]
+    assert [e.task for e in changes.removed] == [walk]
+    assert [e.task for e in changes.retimed] == [feed]
+    assert changes.moved == [] and changes.skipped_changed
+    assert not after.diff(after)
+
+    swapped = Plan(entries=[before.entries[1], before.entries[0], before.entries[2]], skipped=[play])
+    assert [e.task for e in swapped.diff(before).moved] == [walk]
+    # Moving the last slot to the front moves only that slot, not the three it jumped.
+    rotated = [slot(t, 480) for t in (walk, feed, brush, play)]
+    front = Plan(entries=[rotated[3], *rotated[:3]], skipped=[])
+    assert [e.task for e in front.diff(Plan(entries=rotated, skipped=[])).moved] == [play]
+    assert after.explain([after.explain_line(e) for e in after.entries]) == after.explain()
+
+
+# --- Plan rendering ------------------------------------------------------
+
+
+def test_rendering_is_memoized_per_entry_and_streams():
+    """Rows/lines should be reused until the slot or its task changes; iter_explain matches explain."""
+    walk = Task("Walk", 30, "high")
+    plan = Scheduler(available_minutes=40).build_plan([walk, Task("Feed", 10), Task("Brush", 20, "low")])
+    first = plan.to_table()
+    rendered = plan.entries[0]._rendered
+    assert plan.to_table() == first and plan.entries[0]._rendered is rendered  # reused, not re-formatted
+
+    walk.title = "Long walk"
+    plan.entries[1].start_minute += 5
+    rows = plan.to_table()
+    assert rows[0]["task"] == "Long walk" and rows[0] is not first[0]
+    assert rows[1]["start"] == "08:35" and plan.explain_line(plan.entries[1]).startswith("08:35 — Feed")
+
+    lines = plan.iter_explain()
+    assert next(lines).startswith("Scheduled 2 task(s)")
+    assert "\n".join(plan.iter_explain()) == plan.explain()
+    assert plan.explain().endswith("Skipped (not enough time): Brush")
+
+
+def test_rendered_rows_are_copies_of_the_memo():
+    """Editing a row from to_table or Plan.row should not change what the plan renders next."""
+    plan = Scheduler(available_minutes=40).build_plan([Task("Walk", 30, "high")])
+    plan.to_table()[0]["task"] = "edited by the caller"
+    plan.row(plan.entries[0])["start"] = "never"
+    assert plan.to_table() == [
+        {"start": "08:00", "end": "08:30", "task": "Walk", "duration_minutes": 30, "priority": "high"}
+    ]
+
+
+# --- Benchmarks ----------------------------------------------------------
+
+
+def test_benchmark_compare_flags_throughput_regressions():
+    """The benchmark suite should flag only drops beyond the threshold."""
+    owners = make_owners(2, 2, 5, seed=1)
+    assert [len(p.tasks) for o in owners for p in o.pets] == [5, 5, 5, 5]
+    assert [t.title for t in make_owners(2, 2, 5, seed=1)[1].pets[1].tasks] == [
+        t.title for t in owners[1].pets[1].tasks
+    ]
+
+    baseline = {"scales": {"small": {"build_plan": {"items_per_sec": 1000.0}}}}
+    slower = {"scales": {"small": {"build_plan": {"items_per_sec": 700.0}}}}
+    assert compare(slower, baseline, threshold=0.5) == []
+    assert len(compare(slower, baseline, threshold=0.25)) == 1
+
+
+# --- Instrumentation -----------------------------------------------------
+
+
+def test_recorder_collects_spans_and_counters():
+    """An instrumented scheduler should report spans and counters to its sinks."""
+    memory, stream = MemorySink(), io.StringIO()
+    scheduler = Scheduler(available_minutes=30, recorder=Recorder(memory, JsonLinesSink(stream)))
+    plan = scheduler.build_plan([Task("Walk", 20, priority="high"), Task("Groom", 25), Task("Feed", 10)])
+    scheduler.detect_conflicts(plan.entries)
+    plan.explain()
+
+    assert memory.counters == {
+        "tasks_considered": 3, "tasks_placed": 2, "tasks_skipped": 1,
+        "conflict_slots_checked": 2, "conflict_pairs": 0,
+    }
+    assert {name: stats["count"] for name, stats in memory.spans.items()} == {
+        "build_plan": 1, "detect_conflicts": 1, "explain": 1,
+    }
+    assert 'pawpal_events_total{event="tasks_placed"} 2' in memory.to_prometheus()
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert {e["name"] for e in events if e["type"] == "span"} == {"build_plan", "detect_conflicts", "explain"}
+
+
+# --- Plan cache ----------------------------------------------------------
+
+
+def test_plan_cache_hits_until_tasks_change():
+    """Identical task lists should hit; a planning-relevant edit should miss."""
+    cache = PlanCache(maxsize=2)
+    scheduler = Scheduler(available_minutes=40, cache=cache)
+    mochi = [Task("Walk", 30, priority="high"), Task("Feed", 10), Task("Brush", 15, priority="low")]
+    luna = [Task("Play", 30, priority="high"), Task("Litter", 10), Task("Comb", 15, priority="low")]
+
+    first = scheduler.build_plan(mochi, pet_name="Mochi")
+    second = scheduler.build_plan(luna, pet_name="Luna")  # same routine, other tasks
+    assert cache.stats()["hits"] == 1
+    # Hits are rebuilt against the caller's own tasks and pet name.
+    assert [e.task for e in second.entries] == luna[:2]
+    assert second.entries[0].pet_name == "Luna"
+    assert second.skipped[0] is luna[2]
+
+    mochi[0].mark_complete()  # status doesn't affect planning
+    scheduler.build_plan(mochi)
+    assert cache.stats()["hits"] == 2
+
+    mochi[2].priority = "high"  # changes the plan, so it must not hit
+    changed = scheduler.build_plan(mochi)
+    assert cache.stats()["misses"] == 2
+    assert [e.task.title for e in changed.entries] == ["Brush", "Feed"]
+    assert [e.task.title for e in first.entries] == ["Walk", "Feed"]
+
+    scheduler.build_plan([Task("Solo", 5)])
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+# --- Time windows --------------------------------------------------------
+
+
+def test_windows_and_blocked_time_place_tasks_in_free_gaps():
+    """Tasks should land in the earliest free gap that fits their window, around blocked time."""
+    owner = Owner("Jordan", preferences={
+        "day_start": time(7, 0),
+        "available_minutes": 120,
+        "blocked": [(time(8, 0), time(17, 0))],
+    })
+    tasks = [
+        Task("Walk", 45, priority="high", earliest=time(7, 30)),  # 07:30-08:15 hits the block
+        Task("Meds", 5, priority="high", latest=time(7, 10)),
+        Task("Dinner", 15, priority="medium", earliest=time(18, 0), latest=time(18, 30)),
+        Task("Groom", 60, priority="low", latest=time(8, 0)),  # only 55 free minutes before 08:00
+    ]
+    scheduler = Scheduler.for_owner(owner)
+    plan = scheduler.build_plan(tasks)
+
+    slots = {e.task.title: (f"{e.start_time:%H:%M}", f"{e.end_time:%H:%M}") for e in plan.entries}
+    assert slots == {"Walk": ("17:00", "17:45"), "Meds": ("07:00", "07:05"), "Dinner": ("18:00", "18:15")}
+    assert [t.title for t in plan.skipped] == ["Groom"]
+
+    planner = IncrementalPlanner(scheduler, tasks)
+    assert planner.plan == plan
+    planner.remove(tasks[1])
+    assert planner.plan == scheduler.build_plan(tasks[:1] + tasks[2:])
+
+    with pytest.raises(ValueError):
+        Scheduler(available_minutes=60, blocked=[(time(9, 0), time(8, 0))])
+
+
+# --- Shared owner timeline -----------------------------------------------
+
+
+def test_shared_plan_interleaves_pets_by_priority_and_weight():
+    """One budget and one timeline for all pets: no conflicts, fair shares by weight."""
+    owner = Owner("Jordan")
+    for name in ("Mochi", "Luna"):
+        pet = Pet(name, species="dog")
+        pet.add_task(Task("Meds", 5, priority="high"))
+        for i in range(6):
+            pet.add_task(Task(f"Play {i}", 10, priority="low"))
+        owner.add_pet(pet)
+
+    scheduler = Scheduler(available_minutes=90, start_time=time(8, 0))
+    plan = scheduler.build_shared_plan(owner, weights={"Mochi": 2})
+
+    assert [(e.pet_name, e.task.title) for e in plan.entries[:2]] == [("Mochi", "Meds"), ("Luna", "Meds")]
+    assert scheduler.detect_conflicts(plan.entries) == []
+    assert plan.total_minutes == 90 and plan.entries[-1].end_time == time(9, 30)
+    low_minutes = {name: sum(e.task.duration_minutes for e in plan.entries
+                             if e.pet_name == name and e.task.priority == "low") for name in ("Mochi", "Luna")}
+    assert low_minutes == {"Mochi": 50, "Luna": 30}
+
+
+def test_shared_plan_sorts_unqueried_pets_without_indexing_them():
+    """build_shared_plan should sort a pet with no index (like plan_pet) and give the same plan as an indexed pet."""
+    tasks = [Task("Walk", 30, "high"), Task("Brush", 15, "low"), Task("Feed", 10, "high")]
+    cold = Owner("Jordan", pets=[Pet("Mochi", species="dog", tasks=list(tasks))])
+    warm = Owner("Jordan", pets=[Pet("Mochi", species="dog", tasks=list(tasks))])
+    warm.pets[0].tasks_by_priority()  # builds its index
+
+    scheduler = Scheduler(available_minutes=45)
+    assert scheduler.build_shared_plan(cold).to_table() == scheduler.build_shared_plan(warm).to_table()
+    assert cold.pets[0]._index is None
+
+
+# --- Storage -------------------------------------------------------------
+
+
+def _storage_owner():
+    owner = Owner("Jordan", preferences={"day_start": time(8, 0), "available_minutes": 120})
+    mochi = Pet("Mochi", species="dog", breed="Shiba Inu")
+    mochi.add_task(Task("Walk", 30, priority="high", category="walk", earliest=time(7, 0), latest=time(9, 0)))
+    mochi.add_task(Task("Meds", 5, category="meds", recurrence="daily", due_date=date(2026, 6, 20)))
+    luna = Pet("Luna", species="cat")
+    luna.add_task(Task("Feed", 10, category="feeding", status="complete"))
+    owner.add_pet(mochi)
+    owner.add_pet(luna)
+    return owner
+
+
+def test_sqlite_store_round_trips_and_pushes_down_filters(tmp_path):
+    """Saved owners should load back intact, and find_tasks should filter in SQL."""
+    store = SQLiteStore(str(tmp_path / "pawpal.db"), pool_size=2)
+    original = _storage_owner()
+    store.save_owners([original])
+    store.save_owners([original])  # re-saving replaces rather than duplicates
+
+    (loaded,) = store.load_owners()
+    assert loaded.preferences == original.preferences
+    assert [(p.name, p.breed, p.tasks) for p in loaded.pets] == [
+        (p.name, p.breed, p.tasks) for p in original.pets
+    ]
+    assert [t.title for t in store.find_tasks("Jordan", completed=False)] == ["Walk", "Meds"]
+    assert [t.title for t in store.find_tasks("Jordan", pet_name="luna")] == ["Feed"]
+    assert [t.title for t in store.find_tasks("Jordan", due_date=date(2026, 6, 20))] == ["Meds"]
+    store.close()
+
+
+def test_snapshot_round_trips_into_task_stores(tmp_path):
+    """A binary snapshot should load back (via mmap) into TaskStore-backed pets."""
+    path = str(tmp_path / "pawpal.snap")
+    original = _storage_owner()
+    write_snapshot([original], path)
+
+    (loaded,) = read_snapshot(path)
+    assert loaded.name == "Jordan" and loaded.preferences == original.preferences
+    assert isinstance(loaded.pets[0].tasks, TaskStore)
+    assert [[t.to_task() for t in p.tasks] for p in loaded.pets] == [p.tasks for p in original.pets]
+    assert [t.title for t in loaded.find_tasks(completed=True)] == ["Feed"]
+    loaded.pets[0].complete_task(1)  # stores stay writable after a bulk load
+    assert loaded.pets[0].tasks[2].due_date == date(2026, 6, 21)
+
+
+# --- Import / export -----------------------------------------------------
+
+
+def test_import_streams_rows_onto_owners_and_reports_bad_lines():
+    """CSV and JSONL rows should attach to (new or existing) pets; bad rows name their line."""
+    jordan = _storage_owner()
+    csv_dump = io.StringIO(
+        "owner,pet,species,title,duration_minutes,priority,due_date\n"
+        "Jordan,Mochi,dog,Brush,15,low,\n"
+        "Sam,Rex,dog,Walk,30,high,2026-06-20\n"
+    )
+    owners = load_owners(csv_dump, owners=[jordan], compact=True)
+    assert [o.name for o in owners] == ["Jordan", "Sam"]
+    assert [t.title for t in jordan.pets[0].tasks] == ["Walk", "Meds", "Brush"]
+    assert isinstance(owners[1].pets[0].tasks, TaskStore)
+    assert owners[1].find_tasks(due_date=date(2026, 6, 20))[0].priority == "high"
+
+    jsonl_dump = io.StringIO('{"owner": "Sam", "pet": "Rex", "title": "Feed", "duration_minutes": 10}\n\n'
+                             '{"owner": "Sam", "pet": "Rex", "title": "Nap", "duration_minutes": 0}\n')
+    with pytest.raises(ValueError, match="line 3: duration_minutes must be positive"):
+        load_owners(jsonl_dump, "jsonl")
+
+
+def test_import_rejects_non_text_json_values_with_their_line():
+    """JSON lists, objects or numbers in text fields should fail with the line number, not a TypeError."""
+    for field, value in [("priority", '["high"]'), ("recurrence", '{"every": 1}'), ("status", '["done"]'), ("category", "[1]"),
+                         ("due_date", "20260620"), ("earliest", "[7, 0]")]:
+        bad = io.StringIO(f'{{"owner": "Sam", "pet": "Rex", "title": "Feed", "duration_minutes": 10, "{field}": {value}}}\n')
+        with pytest.raises(ValueError, match=f"line 1: .*{field}"):
+            load_owners(bad, "jsonl")
+
+
+def test_import_parse_cache_keeps_dates_and_times_apart():
+    """A time already parsed for one column should still be rejected as a date in another."""
+    mixed = io.StringIO('{"owner": "Sam", "pet": "Rex", "title": "Feed", "duration_minutes": 10, "earliest": "07:00"}\n'
+                        '{"owner": "Sam", "pet": "Rex", "title": "Walk", "duration_minutes": 20, "due_date": "07:00"}\n')
+    with pytest.raises(ValueError, match="line 2: due_date must be YYYY-MM-DD"):
+        load_owners(mixed, "jsonl")
+
+
+def test_plan_export_streams_rows_with_pet_names():
+    """Exported CSV/JSONL rows should match to_table plus the pet column."""
+    owner = _storage_owner()
+    scheduler = Scheduler(available_minutes=60)
+    plans = [scheduler.build_plan(p.tasks, pet_name=p.name) for p in owner.pets]
+
+    out = io.StringIO()
+    assert write_plan_jsonl(iter(plans), out) == 3
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert rows[0] == {"pet": "Mochi", **plans[0].to_table()[0]}
+    assert rows[2]["pet"] == "Luna"
+
+    out = io.StringIO()
+    assert write_plan_csv(plans, out) == 3
+    assert out.getvalue().splitlines()[:2] == [
+        "pet,start,end,task,duration_minutes,priority",
+        "Mochi,08:00,08:30,Walk,30,high",
+    ]
+
+    out = io.StringIO()
+    assert write_plan_text(plans, out) == len(plans[0].explain().splitlines()) + len(plans[1].explain().splitlines())
+    assert out.getvalue() == plans[0].explain() + "\n\n" + plans[1].explain() + "\n"
+
+
+# --- Command line --------------------------------------------------------
+
+
+def test_cli_plans_every_pet_as_json_lines(tmp_path, capsys):
+    """`python -m pawpal` should read task files and print one JSON plan per pet."""
+    dump = tmp_path / "tasks.jsonl"
+    dump.write_text(
+        '{"owner": "Jo", "pet": "Mochi", "title": "Walk", "duration_minutes": 30, "priority": "high"}\n'
+        '{"owner": "Jo", "pet": "Mochi", "title": "Brush", "duration_minutes": 60}\n'
+        '{"owner": "Jo", "pet": "Luna", "title": "Feed", "duration_minutes": 10}\n'
+    )
+    assert pawpal.main([str(dump), "--available-minutes", "45", "--start", "07:30", "--output", "table"]) == 0
+    mochi, luna = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert mochi["table"][0]["start"] == "07:30" and mochi["skipped"] == ["Brush"]
+    assert luna["pet"] == "Luna" and "explain" not in luna
+
+    assert pawpal.main([str(tmp_path / "missing.csv")]) == 1
+    assert "missing.csv" in capsys.readouterr().err
+
+
+# --- Planning service ----------------------------------------------------
+
+
+async def _http_get(port, target):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nConnection: close\r\n\r\n".encode())
+    head, _, body = (await reader.read()).partition(b"\r\n\r\n")
+    writer.close()
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_service_coalesces_concurrent_plan_requests():
+    """Concurrent identical plan requests should share one computation."""
+    owner = _storage_owner()
+    sink = MemorySink()
+    service = PlanningService([owner], recorder=Recorder(sink))
+
+    async def burst():
+        return await asyncio.gather(*(service.plan(owner, {"available_minutes": "60"}) for _ in range(20)))
+
+    bodies = asyncio.run(burst())
+    assert all(body is bodies[0] for body in bodies)
+    assert sink.counters["service_requests_coalesced"] == 19
+    assert sink.counters["tasks_considered"] == 3  # one plan for the whole burst
+
+
+def test_service_routes_answer_json_with_status_codes():
+    """HTTP routes should answer JSON: plans and pet-tagged task lists, 404 for unknown owners, 400 for bad input."""
+    service = PlanningService([_storage_owner()])
+
+    async def scenario():
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return [
+                await _http_get(port, "/owners/Jordan/plan?available_minutes=60"),
+                await _http_get(port, "/owners/Jordan/tasks?pet=Luna"),
+                await _http_get(port, "/owners/Nobody/plan"),
+                await _http_get(port, "/owners/Jordan/plan?start=noon"),
+            ]
+
+    plan, tasks, unknown, bad = asyncio.run(scenario())
+    assert plan[0] == 200 and plan[1]["pets"][0]["table"][0]["task"] == "Walk"
+    assert tasks[0] == 200 and [(t["pet"], t["title"]) for t in tasks[1]["tasks"]] == [("Luna", "Feed")]
+    assert (unknown[0], bad[0]) == (404, 400)
+
+
+def test_service_caps_budgets_and_rejects_bad_preferences():
+    """Budgets should be capped at a day, and an owner's bad blocked time should be a 400, not a dropped connection."""
+    owner = _storage_owner()
+    service = PlanningService([owner])
+    status, body = asyncio.run(service.handle("GET", "/owners/Jordan/plan?available_minutes=1000000"))
+    assert status == 200 and body["available_minutes"] == 24 * 60
+
+    owner.add_preference("blocked", [(time(9, 0), time(8, 0))])
+    status, body = asyncio.run(service.handle("GET", "/owners/Jordan/plan?available_minutes=60"))
+    assert status == 400 and "Blocked interval" in body["error"]